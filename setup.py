@@ -1,3 +1,6 @@
+import importlib.util
+import sys
+
 from setuptools import setup, find_packages
 
 with open("README.md", "r", encoding="utf-8") as fh:
@@ -6,6 +9,29 @@ with open("README.md", "r", encoding="utf-8") as fh:
 with open("requirements.txt", "r", encoding="utf-8") as fh:
     requirements = [line.strip() for line in fh if line.strip() and not line.startswith("#")]
 
+def get_ext_modules():
+    """
+    Build the AOT scoring kernel when Numba is available at install time, and
+    compile the energy optimizer with mypyc when the "compiled" extra is installed.
+    """
+    ext_modules = []
+    try:
+        spec = importlib.util.spec_from_file_location(
+            "src.ai_models.build_kernel", "src/ai_models/build_kernel.py")
+        build_kernel = importlib.util.module_from_spec(spec)
+        sys.modules[spec.name] = build_kernel
+        spec.loader.exec_module(build_kernel)
+        ext_modules.append(build_kernel.cc.distutils_extension())
+    except ImportError:
+        pass
+
+    try:
+        from mypyc.build import mypycify
+        ext_modules.extend(mypycify(["--ignore-missing-imports", "src/ai_models/energy_optimizer.py"]))
+    except ImportError:
+        pass
+    return ext_modules
+
 setup(
     name="dual-energy-source",
     version="1.0.0",
@@ -39,11 +65,13 @@ setup(
     packages=find_packages(),
     python_requires=">=3.7",
     install_requires=requirements,
+    ext_modules=get_ext_modules(),
     extras_require={
         "hardware": [
             "RPi.GPIO>=0.7.0",
             "adafruit-circuitpython-ads1x15>=2.2.0",
             "w1thermsensor>=2.0.0",
+            "pigpio>=1.78",
         ],
         "dev": [
             "pytest>=6.0.0",
@@ -55,6 +83,13 @@ setup(
             "plotly>=5.0.0",
             "dash>=2.0.0",
         ],
+        "performance": [
+            "numba>=0.56.0",
+            "orjson>=3.6",
+        ],
+        "compiled": [
+            "mypy>=1.0",
+        ],
     },
     entry_points={
         "console_scripts": [
@@ -5,6 +5,11 @@ __version__ = "1.0.0"
 __author__ = "AI Assistant"
 __email__ = "ai.assistant@example.com"
 
-from .main import DualEnergySystem
+# Resolved on first access so `python -m src.main` does not import main twice
+def __getattr__(name):
+    if name == 'DualEnergySystem':
+        from .main import DualEnergySystem
+        return DualEnergySystem
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 __all__ = ['DualEnergySystem']
@@ -0,0 +1,37 @@
+"""
+Scoring Kernel AOT Build
+========================
+
+Compiles the energy optimizer's scoring kernel ahead of time with numba.pycc
+into the `_energy_kernel` extension module. Deployments that ship the compiled
+module (e.g. Raspberry Pi installs) skip JIT compilation and do not need Numba
+or LLVM at runtime.
+
+Run directly to build the module next to this file:
+    python src/ai_models/build_kernel.py
+setup.py also picks up `cc` to build the module during installation.
+"""
+
+import os
+import sys
+
+from numba.pycc import CC
+
+# Load the kernel source under its package name, the module name its numba cache
+# entries record, so the runtime can reuse them. A previously built extension is
+# hidden for the import so the JIT path is used for export.
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
+sys.modules['src.ai_models._energy_kernel'] = None
+try:
+    from src.ai_models import energy_optimizer
+finally:
+    del sys.modules['src.ai_models._energy_kernel']
+
+cc = CC('_energy_kernel')
+cc.verbose = True
+cc.export('score', energy_optimizer._SCORE_SIGNATURE)(energy_optimizer._score_kernel.py_func)
+
+if __name__ == "__main__":
+    cc.compile()
@@ -6,273 +6,572 @@ A simplified rule-based energy optimizer that works without TensorFlow dependenc
 This provides intelligent energy source selection based on environmental conditions.
 """
 
-import numpy as np
 import logging
-from datetime import datetime
+from bisect import bisect_left
+from collections import deque
+from functools import lru_cache
+from importlib.machinery import EXTENSION_SUFFIXES
+from itertools import product
+from types import MappingProxyType
+from typing import Any, ClassVar, Deque, Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+try:
+    from typing import final
+except ImportError:  # Python 3.7
+    def final(cls):  # type: ignore[misc]
+        """Fallback no-op for typing.final."""
+        return cls
+
+# Ahead-of-time compiled scoring kernel (see build_kernel.py)
+try:
+    from ._energy_kernel import score as _aot_score_kernel
+    AOT_KERNEL_AVAILABLE = True
+except ImportError:
+    AOT_KERNEL_AVAILABLE = False
+
+# Set when this module was compiled to a C extension with mypyc (see setup.py);
+# a .pyc-only or zipped install still runs the pure-Python module
+MYPYC_COMPILED = __file__.endswith(tuple(EXTENSION_SUFFIXES))
+
+# Optional JIT compilation of the scoring kernel, not needed with the AOT build.
+# Numba cannot JIT mypyc-compiled functions, which are already native code, and
+# can only cache compiled kernels on disk when the .py source is installed.
+NUMBA_AVAILABLE = False
+_NUMBA_CACHE = __file__.endswith('.py')
+if not AOT_KERNEL_AVAILABLE and not MYPYC_COMPILED:
+    try:
+        from numba import njit
+        NUMBA_AVAILABLE = True
+    except ImportError:
+        pass
+
+if not NUMBA_AVAILABLE:
+    def njit(*args, **kwargs):  # type: ignore[no-redef]
+        """Fallback decorator that leaves the function as plain Python."""
+        def decorator(func):
+            return func
+        return decorator
 
 logger = logging.getLogger(__name__)
 
+# Solar scoring thresholds
+SOLAR_GOOD_IRRADIANCE = 600    # W/m²
+SOLAR_MODERATE_IRRADIANCE = 300
+SOLAR_MIN_IRRADIANCE = 100
+
+# Thermal scoring thresholds
+THERMAL_GOOD_TEMP = 25         # °C
+THERMAL_EXCELLENT_TEMP = 30
+THERMAL_MIN_WIND = 5           # m/s
+
+# Battery scoring thresholds
+BATTERY_HIGH_LEVEL = 80        # %
+BATTERY_GOOD_LEVEL = 50
+BATTERY_LOW_LEVEL = 20
+BATTERY_CRITICAL_LEVEL = 10
+
+# Load and daylight thresholds
+HIGH_POWER_DEMAND = 150        # W
+DAYTIME_START = 6              # hour of day
+DAYTIME_END = 18
+
+# Energy sources in prediction index order, with their display names
+SOURCES = ('solar', 'thermal', 'battery')
+SOURCE_NAMES = ('Solar Power', 'Thermal Energy', 'Battery Power')
+
+# Kernel signature: (solar, temp, battery, demand, wind, time_of_day, weather_code)
+# -> (prediction, confidence, solar_score, thermal_score, battery_score)
+_SCORE_SIGNATURE = 'Tuple((int64,float64,int64,int64,int64))(float64,float64,float64,float64,float64,float64,int8)'
+
+# Kernel result tuple and the score breakdown returned with each prediction
+ScoreResult = Tuple[int, float, int, int, int]
+ScoreBreakdown = Dict[str, int]
+
+# Weather condition codes understood by the scoring kernel
+WEATHER_OTHER = -1
+WEATHER_CLEAR = 0
+WEATHER_CLOUDY = 1
+WEATHER_RAIN = 2
+
+# Column order of the (N, 7) feature matrix accepted by predict_optimal_source_batch
+BATCH_FEATURES = ('solar_irradiance', 'temperature', 'battery_level', 'power_demand',
+                  'wind_speed', 'time_of_day', 'weather_code')
+
+# Values used for features missing from a dict-of-arrays batch
+BATCH_DEFAULTS = {
+    'solar_irradiance': 0,
+    'temperature': 20,
+    'battery_level': 50,
+    'power_demand': 100,
+    'wind_speed': 0,
+    'time_of_day': 12,
+    'weather_code': WEATHER_CLEAR
+}
+
+
+class Reading(NamedTuple):
+    """One standardized set of sensor readings, as consumed by the scoring path."""
+    solar_irradiance: float
+    temperature: float
+    humidity: float
+    battery_level: float
+    power_demand: float
+    wind_speed: float
+    time_of_day: float
+    weather_code: int
+
+
+# Common weather tokens, resolved without any string processing
+_WEATHER_MAP = {
+    'clear': WEATHER_CLEAR,
+    'sunny': WEATHER_CLEAR,
+    'clear_night': WEATHER_CLEAR,
+    'cloudy': WEATHER_CLOUDY,
+    'overcast': WEATHER_CLOUDY,
+    'partly_cloudy': WEATHER_CLOUDY,
+    'rain': WEATHER_RAIN,
+    'rainy': WEATHER_RAIN,
+    'storm': WEATHER_RAIN,
+    'thunderstorm': WEATHER_RAIN
+}
+
+
+def _weather_code(weather: str) -> int:
+    """Translate a free-form weather description to a kernel weather code."""
+    code = _WEATHER_MAP.get(weather)
+    if code is None:
+        code = _classify_weather(weather)
+    return code
+
+
+@lru_cache(maxsize=256)
+def _classify_weather(weather: Optional[str]) -> int:
+    """Classify other weather descriptions by keyword."""
+    weather = (weather or '').lower()
+    if 'cloudy' in weather or 'overcast' in weather:
+        return WEATHER_CLOUDY
+    elif 'rain' in weather or 'storm' in weather:
+        return WEATHER_RAIN
+    elif 'sunny' in weather or 'clear' in weather:
+        return WEATHER_CLEAR
+    return WEATHER_OTHER
+
+
+def _score_terms(solar_irradiance: Any, temperature: Any, battery_level: Any, power_demand: Any,
+                 wind_speed: Any, time_of_day: Any, weather_code: Any) -> Tuple[Any, Any, Any]:
+    """
+    Compute (solar_score, thermal_score, battery_score) without branching.
+    Every rule is a weighted boolean, so the same code scores scalars and
+    whole NumPy arrays.
+    """
+    # Shared conditions
+    daytime = (DAYTIME_START <= time_of_day) & (time_of_day <= DAYTIME_END)
+    night = (time_of_day < DAYTIME_START) | (time_of_day > DAYTIME_END)
+    high_demand = power_demand > HIGH_POWER_DEMAND
+    clear = weather_code == WEATHER_CLEAR
+    cloudy = weather_code == WEATHER_CLOUDY
+    rain = weather_code == WEATHER_RAIN
+    
+    solar_score = (3 * (solar_irradiance > SOLAR_GOOD_IRRADIANCE)
+                   + 2 * ((solar_irradiance > SOLAR_MODERATE_IRRADIANCE) & (solar_irradiance <= SOLAR_GOOD_IRRADIANCE))
+                   + ((solar_irradiance > SOLAR_MIN_IRRADIANCE) & (solar_irradiance <= SOLAR_MODERATE_IRRADIANCE))
+                   + daytime
+                   - 2 * night
+                   + clear
+                   - cloudy
+                   - 2 * rain)
+    
+    # Wind helps thermal systems, high demand favors stable sources
+    thermal_score = (3 * (temperature > THERMAL_EXCELLENT_TEMP)
+                     + 2 * ((temperature > THERMAL_GOOD_TEMP) & (temperature <= THERMAL_EXCELLENT_TEMP))
+                     + (wind_speed > THERMAL_MIN_WIND)
+                     + high_demand
+                     + night
+                     + cloudy)
+    
+    # Low battery is penalised once; the original critical-level branch sat behind
+    # the low-level one and never applied
+    battery_score = (2 * (battery_level > BATTERY_HIGH_LEVEL)
+                     + ((battery_level > BATTERY_GOOD_LEVEL) & (battery_level <= BATTERY_HIGH_LEVEL))
+                     - 3 * (battery_level < BATTERY_LOW_LEVEL)
+                     + high_demand
+                     + night
+                     + rain)
+    
+    return solar_score, thermal_score, battery_score
+
+
+_score_terms_jit = njit(cache=_NUMBA_CACHE, fastmath=True)(_score_terms)
+
+
+@njit(_SCORE_SIGNATURE, cache=_NUMBA_CACHE, fastmath=True)
+def _score_kernel(solar_irradiance: float, temperature: float, battery_level: float,
+                  power_demand: float, wind_speed: float, time_of_day: float,
+                  weather_code: int) -> ScoreResult:
+    """
+    Score each energy source for a single set of standardized readings.
+    The module-level thresholds are folded in as compile-time constants.
+    """
+    solar_score, thermal_score, battery_score = _score_terms_jit(
+        solar_irradiance, temperature, battery_level, power_demand,
+        wind_speed, time_of_day, weather_code)
+    
+    # Find the best option in one pass (ties resolve to the lowest index)
+    max_score = solar_score
+    prediction = 0
+    if thermal_score > max_score:
+        max_score = thermal_score
+        prediction = 1
+    if battery_score > max_score:
+        max_score = battery_score
+        prediction = 2
+    
+    # Calculate confidence
+    total_positive_score = ((solar_score if solar_score > 0 else 0)
+                            + (thermal_score if thermal_score > 0 else 0)
+                            + (battery_score if battery_score > 0 else 0))
+    confidence = max_score / (total_positive_score + 0.1) if total_positive_score > 0 else 0.5
+    
+    return prediction, confidence, solar_score, thermal_score, battery_score
+
+
+if AOT_KERNEL_AVAILABLE:
+    _score_kernel = _aot_score_kernel
+
+
+def _tier_samples(*bounds: float) -> Tuple[float, ...]:
+    """One reading strictly inside each tier delimited by the ascending `bounds`."""
+    return ((bounds[0] - 1.0,)
+            + tuple((low + high) / 2 for low, high in zip(bounds, bounds[1:]))
+            + (bounds[-1] + 1.0,))
+
+
+# Representative reading for every scoring tier of each kernel input, derived from
+# the thresholds above. Any reading inside a tier scores identically, so one
+# decision per tier suffices.
+_TIER_VALUES = (
+    _tier_samples(SOLAR_MIN_IRRADIANCE, SOLAR_MODERATE_IRRADIANCE, SOLAR_GOOD_IRRADIANCE),
+    _tier_samples(THERMAL_GOOD_TEMP, THERMAL_EXCELLENT_TEMP),
+    _tier_samples(BATTERY_CRITICAL_LEVEL, BATTERY_LOW_LEVEL, BATTERY_GOOD_LEVEL, BATTERY_HIGH_LEVEL),
+    _tier_samples(HIGH_POWER_DEMAND),
+    _tier_samples(THERMAL_MIN_WIND),
+    _tier_samples(DAYTIME_START, DAYTIME_END)
+)
+_WEATHER_CODES = (WEATHER_OTHER, WEATHER_CLEAR, WEATHER_CLOUDY, WEATHER_RAIN)
+
+
+def _decision_index(solar_irradiance: float, temperature: float, battery_level: float,
+                    power_demand: float, wind_speed: float, time_of_day: float,
+                    weather_code: int) -> int:
+    """Quantize readings to their scoring tiers and return the flat decision table index."""
+    index = ((solar_irradiance > SOLAR_MIN_IRRADIANCE) + (solar_irradiance > SOLAR_MODERATE_IRRADIANCE)
+             + (solar_irradiance > SOLAR_GOOD_IRRADIANCE))
+    index = index * 3 + (temperature > THERMAL_GOOD_TEMP) + (temperature > THERMAL_EXCELLENT_TEMP)
+    index = index * 5 + ((battery_level >= BATTERY_CRITICAL_LEVEL) + (battery_level >= BATTERY_LOW_LEVEL)
+                         + (battery_level > BATTERY_GOOD_LEVEL) + (battery_level > BATTERY_HIGH_LEVEL))
+    index = index * 2 + (power_demand > HIGH_POWER_DEMAND)
+    index = index * 2 + (wind_speed > THERMAL_MIN_WIND)
+    index = index * 3 + (time_of_day >= DAYTIME_START) + (time_of_day > DAYTIME_END)
+    return index * len(_WEATHER_CODES) + weather_code - WEATHER_OTHER
+
+
+def decision_key(reading: Reading) -> int:
+    """
+    Cache key for a standardized reading: readings share a key exactly when they get
+    the same prediction, confidence, scores, reasoning and sensor analysis.
+    """
+    key = _decision_index(reading.solar_irradiance, reading.temperature, reading.battery_level,
+                          reading.power_demand, reading.wind_speed, reading.time_of_day,
+                          reading.weather_code)
+    # Reasoning and the battery rating split two scoring tiers at their edge
+    key = key * 2 + (reading.solar_irradiance < SOLAR_MIN_IRRADIANCE)
+    return key * 2 + (reading.battery_level > BATTERY_LOW_LEVEL)
+
+
+@lru_cache(maxsize=None)
+def _build_decision_table() -> Tuple[ScoreResult, ...]:
+    """Score every combination of tiers, in _decision_index order; built once per process."""
+    samples = tuple(product(*_TIER_VALUES, _WEATHER_CODES))
+    
+    # Thresholds edited out of ascending order would put samples in the wrong tiers
+    for index, sample in enumerate(samples):
+        if _decision_index(*sample) != index:
+            raise ValueError(f"Scoring thresholds are out of order: sample {sample} is not in tier {index}")
+    
+    return tuple(_score_kernel(*sample) for sample in samples)
+
+
+# Sensor rating bands: a reading above the i-th bound earns rating i + 1
+_SOLAR_BOUNDS = (SOLAR_MIN_IRRADIANCE, SOLAR_MODERATE_IRRADIANCE, SOLAR_GOOD_IRRADIANCE)
+_SOLAR_RATINGS = ('Poor', 'Fair', 'Good', 'Excellent')
+_THERMAL_BOUNDS = (THERMAL_GOOD_TEMP, THERMAL_EXCELLENT_TEMP)
+_THERMAL_RATINGS = ('Fair', 'Good', 'Excellent')
+_BATTERY_BOUNDS = (BATTERY_LOW_LEVEL, BATTERY_GOOD_LEVEL, BATTERY_HIGH_LEVEL)
+_BATTERY_RATINGS = ('Critical', 'Fair', 'Good', 'Excellent')
+
+
+def _build_reason_table(reason_strings: Sequence[Sequence[str]],
+                        default_reasons: Tuple[str, ...]) -> Tuple[Tuple[Tuple[str, ...], ...], ...]:
+    """Expand per-source reason strings into one tuple per 3-bit reason mask."""
+    return tuple(
+        tuple(
+            tuple(reason for bit, reason in enumerate(reasons) if mask & (1 << bit)) or default_reasons
+            for mask in range(1 << len(reasons))
+        )
+        for reasons in reason_strings
+    )
+
+
+@final
 class EnergyOptimizer:
     """Simple rule-based energy source optimization engine."""
     
-    def __init__(self, config=None):
+    __slots__ = ('config', 'name', 'version', 'log_batch_size',
+                 '_decision_table', '_recent_predictions', '_model_info')
+    
+    # Tunable thresholds reported as model features
+    _THRESHOLD_FEATURES: ClassVar[Tuple[str, ...]] = (
+        'good_irradiance', 'moderate_irradiance', 'min_irradiance',
+        'good_temp', 'excellent_temp', 'min_wind',
+        'high_level', 'good_level', 'low_level', 'critical_level'
+    )
+    
+    # Numeric Reading fields in order: (key, alias key, alias scale factor, default)
+    _FIELD_SPECS: ClassVar[Tuple[Tuple[str, Optional[str], Optional[float], float], ...]] = (
+        ('solar_irradiance', 'solar_voltage', 50, 0),
+        ('temperature', 'ambient_temperature', None, 20),
+        ('humidity', None, None, 50),
+        ('battery_level', 'battery_soc', None, 50),
+        ('power_demand', 'load_demand', None, 100),
+        ('wind_speed', None, None, 0),
+        ('time_of_day', 'hour_of_day', None, 12)
+    )
+    
+    # Reasoning sentences per source, ordered by reason bit
+    _REASON_STRINGS: ClassVar[Tuple[Tuple[str, ...], ...]] = (
+        ("Excellent solar irradiance detected",
+         "Daytime hours favor solar energy",
+         "Battery level adequate for solar operation"),
+        ("High temperature excellent for thermal energy",
+         "Wind conditions support thermal efficiency",
+         "High power demand suits thermal stability"),
+        ("Night time favors battery usage",
+         "Low solar availability requires battery backup",
+         "High battery level available for use")
+    )
+    _REASON_TABLE: ClassVar[Tuple[Tuple[Tuple[str, ...], ...], ...]] = _build_reason_table(_REASON_STRINGS, ("Default decision based on current conditions",))
+    
+    def __init__(self, config: Optional[Mapping[str, Any]] = None) -> None:
         """Initialize the energy optimizer."""
-        self.config = config or {}
-        self.name = "Simple Energy Optimizer"
-        self.version = "1.0"
+        self.config: Mapping[str, Any] = config or {}
+        self.name: str = "Simple Energy Optimizer"
+        self.version: str = "1.0"
         
-        # Decision thresholds
-        self.solar_thresholds = {
-            'good_irradiance': 600,
-            'moderate_irradiance': 300,
-            'min_irradiance': 100
-        }
+        # Model description never changes after construction
+        self._model_info: Mapping[str, Any] = MappingProxyType({
+            'name': self.name,
+            'version': self.version,
+            'type': 'rule_based',
+            'features': self._THRESHOLD_FEATURES
+        })
         
-        self.thermal_thresholds = {
-            'good_temp': 25,
-            'excellent_temp': 30,
-            'min_wind': 5
-        }
+        # Full decision surface, shared by every instance, so predictions are a single lookup
+        self._decision_table: Tuple[ScoreResult, ...] = _build_decision_table()
         
-        self.battery_thresholds = {
-            'high_level': 80,
-            'good_level': 50,
-            'low_level': 20,
-            'critical_level': 10
-        }
+        # Decisions summarized per "AI Prediction" log line (1 logs every decision)
+        self.log_batch_size: int = max(1, int(self.config.get('ai_model.prediction_log_batch', 1)))
+        self._recent_predictions: Deque[Tuple[str, float]] = deque(maxlen=self.log_batch_size)
         
         logger.info(f"Initialized {self.name} v{self.version}")
     
-    def predict_optimal_source(self, sensor_data):
+    def predict_optimal_source(self, sensor_data: Mapping[str, Any]) -> str:
         """
         Predict optimal energy source based on sensor data.
         Returns: energy source string ('solar', 'thermal', 'battery')
         """
         # Convert sensor data to standardized format
-        standardized_data = self._standardize_sensor_data(sensor_data)
+        reading = self.standardize_sensor_data(sensor_data)
         
         # Get prediction from rule-based system
-        prediction, confidence, scores = self._predict_energy_source(standardized_data)
+        prediction, confidence, scores = self._predict_energy_source(reading)
         
         # Convert prediction index to source name
-        sources = ['solar', 'thermal', 'battery']
-        optimal_source = sources[prediction]
+        optimal_source = SOURCES[prediction]
         
-        logger.info(f"AI Prediction: {optimal_source} (confidence: {confidence:.2%})")
+        if logger.isEnabledFor(logging.INFO):
+            self._log_prediction(optimal_source, confidence)
         
         return optimal_source
     
-    def _standardize_sensor_data(self, sensor_data):
-        """Convert various sensor data formats to standardized format."""
-        # Extract values with defaults
-        standardized = {
-            'solar_irradiance': sensor_data.get('solar_irradiance', 
-                                               sensor_data.get('solar_voltage', 0) * 50),
-            'temperature': sensor_data.get('temperature', 
-                                         sensor_data.get('ambient_temperature', 20)),
-            'humidity': sensor_data.get('humidity', 50),
-            'battery_level': sensor_data.get('battery_level', 
-                                           sensor_data.get('battery_soc', 50)),
-            'power_demand': sensor_data.get('power_demand', 
-                                          sensor_data.get('load_demand', 100)),
-            'wind_speed': sensor_data.get('wind_speed', 0),
-            'time_of_day': sensor_data.get('time_of_day', 
-                                         sensor_data.get('hour_of_day', 12)),
-            'weather_condition': sensor_data.get('weather_condition', 'clear'),
-            'season': sensor_data.get('season', 'summer')
-        }
+    def _log_prediction(self, optimal_source: str, confidence: float) -> None:
+        """Log a prediction, or buffer it until a full batch can be logged as one line."""
+        if self.log_batch_size == 1:
+            logger.info("AI Prediction: %s (confidence: %.2f%%)", optimal_source, confidence * 100)
+            return
+        
+        self._recent_predictions.append((optimal_source, confidence))
+        if len(self._recent_predictions) == self.log_batch_size:
+            logger.info("AI Predictions (last %d): %s", self.log_batch_size,
+                        ", ".join(f"{source} ({conf:.0%})" for source, conf in self._recent_predictions))
+            self._recent_predictions.clear()
+    
+    def standardize_sensor_data(self, sensor_data: Mapping[str, Any]) -> Reading:
+        """Convert various sensor data formats to a standardized Reading."""
+        values: List[Any] = []
+        
+        # Each field falls back to its alias (optionally rescaled), then to its default
+        for key, alias, scale, default in self._FIELD_SPECS:
+            if key in sensor_data:
+                value = sensor_data[key]
+            elif alias is not None and alias in sensor_data:
+                value = sensor_data[alias]
+                if scale:
+                    value = value * scale
+            else:
+                value = default
+            values.append(float(value))
         
-        return standardized
+        values.append(_weather_code(sensor_data.get('weather_condition', 'clear')))
+        return Reading._make(values)
     
-    def _predict_energy_source(self, sensor_data):
+    def _predict_energy_source(self, reading: Reading) -> Tuple[int, float, ScoreBreakdown]:
         """
         Predict optimal energy source using rule-based logic.
         Returns: (prediction_index, confidence, scores_dict)
         """
-        # Extract sensor values
-        solar_irradiance = sensor_data.get('solar_irradiance', 0)
-        temperature = sensor_data.get('temperature', 20)
-        humidity = sensor_data.get('humidity', 50)
-        battery_level = sensor_data.get('battery_level', 50)
-        power_demand = sensor_data.get('power_demand', 100)
-        wind_speed = sensor_data.get('wind_speed', 0)
-        time_of_day = sensor_data.get('time_of_day', 12)
+        (solar_irradiance, temperature, _humidity, battery_level,
+         power_demand, wind_speed, time_of_day, weather_code) = reading
+        index = _decision_index(solar_irradiance, temperature, battery_level, power_demand,
+                                wind_speed, time_of_day, weather_code)
+        prediction, confidence, solar_score, thermal_score, battery_score = self._decision_table[index]
         
-        # Initialize scores
-        solar_score = 0
-        thermal_score = 0
-        battery_score = 0
+        return prediction, confidence, {
+            'solar_score': solar_score,
+            'thermal_score': thermal_score,
+            'battery_score': battery_score
+        }
+    
+    def predict_optimal_source_batch(self, sensor_batch: Any) -> Tuple[Any, Any, Any]:
+        """
+        Predict optimal energy sources for many sensor rows at once.
+        Accepts a dict of equal-length arrays or a structured array with
+        fields named after BATCH_FEATURES (free-form 'weather_condition'
+        strings are also accepted), or an (N, 7) array with columns in
+        BATCH_FEATURES order.
+        Returns: (predictions, confidences, scores) with shapes (N,), (N,), (N, 3);
+        predictions index SOURCES
+        """
+        import numpy as np  # Loaded on first batch call to keep module import light
         
-        # Solar power scoring
-        if solar_irradiance > self.solar_thresholds['good_irradiance']:
-            solar_score += 3
-        elif solar_irradiance > self.solar_thresholds['moderate_irradiance']:
-            solar_score += 2
-        elif solar_irradiance > self.solar_thresholds['min_irradiance']:
-            solar_score += 1
-            
-        # Time of day bonus for solar (6 AM to 6 PM)
-        if 6 <= time_of_day <= 18:
-            solar_score += 1
-            
-        # Thermal power scoring
-        if temperature > self.thermal_thresholds['excellent_temp']:
-            thermal_score += 3
-        elif temperature > self.thermal_thresholds['good_temp']:
-            thermal_score += 2
-            
-        # Wind helps thermal systems
-        if wind_speed > self.thermal_thresholds['min_wind']:
-            thermal_score += 1
-            
-        # Battery scoring
-        if battery_level > self.battery_thresholds['high_level']:
-            battery_score += 2
-        elif battery_level > self.battery_thresholds['good_level']:
-            battery_score += 1
-            
-        # Penalty for low battery
-        if battery_level < self.battery_thresholds['low_level']:
-            battery_score -= 3
-        elif battery_level < self.battery_thresholds['critical_level']:
-            battery_score -= 5
-            
-        # High demand favors stable sources
-        if power_demand > 150:
-            thermal_score += 1
-            battery_score += 1
+        columns = self._stack_batch(sensor_batch)
+        solar_score, thermal_score, battery_score = _score_terms(*columns)
+        
+        scores = np.stack([solar_score, thermal_score, battery_score], axis=1)
+        predictions = scores.argmax(axis=1).astype(np.int8)
+        
+        # Calculate confidence
+        max_score = np.take_along_axis(scores, predictions[:, np.newaxis], axis=1)[:, 0]
+        total_positive_score = np.clip(scores, 0, None).sum(axis=1)
+        confidences = np.where(total_positive_score > 0, max_score / (total_positive_score + 0.1), 0.5)
+        
+        return predictions, confidences, scores
+    
+    def _stack_batch(self, sensor_batch: Any) -> List[Any]:
+        """Convert a batch of sensor rows into one 1-D array per feature."""
+        import numpy as np
+        
+        fields = sensor_batch.dtype.names if isinstance(sensor_batch, np.ndarray) else None
+        if isinstance(sensor_batch, dict) or fields:
+            # Dict of arrays or structured array: look features up by name
+            names = fields or tuple(sensor_batch)
+            rows = len(sensor_batch[names[0]]) if names else 0
             
-        # Night time adjustments
-        if time_of_day < 6 or time_of_day > 18:
-            thermal_score += 1
-            battery_score += 1
-            solar_score -= 2
+            columns: List[Any] = []
+            for name in BATCH_FEATURES[:-1]:
+                if name in names:
+                    columns.append(np.asarray(sensor_batch[name], dtype=np.float64))
+                else:
+                    columns.append(np.full(rows, BATCH_DEFAULTS[name], dtype=np.float64))
             
-        # Weather adjustments
-        weather = sensor_data.get('weather_condition', '').lower()
-        if 'cloudy' in weather or 'overcast' in weather:
-            solar_score -= 1
-            thermal_score += 1
-        elif 'rain' in weather or 'storm' in weather:
-            solar_score -= 2
-            battery_score += 1
-        elif 'sunny' in weather or 'clear' in weather:
-            solar_score += 1
+            if 'weather_code' in names:
+                weather = np.asarray(sensor_batch['weather_code'], dtype=np.int8)
+            elif 'weather_condition' in names:
+                weather = np.fromiter((_weather_code(w) for w in sensor_batch['weather_condition']),
+                                      dtype=np.int8, count=rows)
+            else:
+                weather = np.full(rows, BATCH_DEFAULTS['weather_code'], dtype=np.int8)
+            columns.append(weather)
             
-        # Find the best option
-        scores = [solar_score, thermal_score, battery_score]
-        prediction = scores.index(max(scores))
+            return columns
         
-        # Calculate confidence
-        max_score = max(scores)
-        total_positive_score = sum(max(0, score) for score in scores)
-        confidence = max_score / (total_positive_score + 0.1) if total_positive_score > 0 else 0.5
+        matrix = np.asarray(sensor_batch, dtype=np.float64)
+        if matrix.ndim != 2 or matrix.shape[1] != len(BATCH_FEATURES):
+            raise ValueError(f"Expected an (N, {len(BATCH_FEATURES)}) array, got shape {matrix.shape}")
         
-        return prediction, confidence, {
-            'solar_score': solar_score,
-            'thermal_score': thermal_score,
-            'battery_score': battery_score
-        }
+        columns = list(matrix[:, :-1].T)
+        columns.append(matrix[:, -1].astype(np.int8))
+        return columns
     
-    def update_model(self, sensor_data, chosen_source):
+    def update_model(self, sensor_data: Mapping[str, Any], chosen_source: str) -> None:
         """Update model with recent performance data (placeholder for future ML)."""
         # In a full ML implementation, this would update the neural network
         # For now, we just log the decision for future analysis
-        logger.debug(f"Decision logged: {chosen_source} chosen for conditions: {sensor_data}")
-        pass
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Decision logged: %s chosen for conditions: %s", chosen_source, sensor_data)
     
-    def get_model_info(self):
-        """Get information about the current model."""
-        return {
-            'name': self.name,
-            'version': self.version,
-            'type': 'rule_based',
-            'features': list(self.solar_thresholds.keys()) + 
-                       list(self.thermal_thresholds.keys()) + 
-                       list(self.battery_thresholds.keys())
-        }
+    def get_model_info(self) -> Mapping[str, Any]:
+        """Get information about the current model (read-only mapping)."""
+        return self._model_info
     
-    def explain_decision(self, sensor_data):
-        """Provide detailed explanation of energy source decision."""
-        standardized_data = self._standardize_sensor_data(sensor_data)
-        prediction, confidence, scores = self._predict_energy_source(standardized_data)
-        
-        sources = ['Solar Power', 'Thermal Energy', 'Battery Power']
-        chosen_source = sources[prediction]
+    def analyze(self, sensor_data: Mapping[str, Any]) -> Dict[str, Any]:
+        """
+        Predict and explain a decision with a single standardize + score pass.
+        Returns: {'optimal_source': 'solar'|'thermal'|'battery', 'explanation': dict}
+        """
+        reading = self.standardize_sensor_data(sensor_data)
+        prediction, confidence, scores = self._predict_energy_source(reading)
         
         explanation = {
-            'chosen_source': chosen_source,
+            'chosen_source': SOURCE_NAMES[prediction],
             'confidence': confidence,
-            'reasoning': self._generate_reasoning(standardized_data, scores, prediction),
+            'reasoning': self._generate_reasoning(reading, scores, prediction),
             'scores': scores,
-            'sensor_analysis': self._analyze_sensors(standardized_data)
+            'sensor_analysis': self._analyze_sensors(reading)
         }
         
-        return explanation
+        return {
+            'optimal_source': SOURCES[prediction],
+            'explanation': explanation
+        }
+    
+    def explain_decision(self, sensor_data: Mapping[str, Any]) -> Dict[str, Any]:
+        """Provide detailed explanation of energy source decision."""
+        return self.analyze(sensor_data)['explanation']
     
-    def _generate_reasoning(self, sensor_data, scores, prediction):
+    def _generate_reasoning(self, reading: Reading, scores: ScoreBreakdown,
+                            prediction: int) -> Tuple[str, ...]:
         """Generate human-readable reasoning for the decision."""
-        reasons = []
+        time_of_day = reading.time_of_day
         
         if prediction == 0:  # Solar
-            if sensor_data['solar_irradiance'] > 600:
-                reasons.append("Excellent solar irradiance detected")
-            if 6 <= sensor_data['time_of_day'] <= 18:
-                reasons.append("Daytime hours favor solar energy")
-            if sensor_data['battery_level'] > 50:
-                reasons.append("Battery level adequate for solar operation")
-                
+            reason_bits = ((reading.solar_irradiance > SOLAR_GOOD_IRRADIANCE)
+                           | (DAYTIME_START <= time_of_day <= DAYTIME_END) << 1
+                           | (reading.battery_level > BATTERY_GOOD_LEVEL) << 2)
         elif prediction == 1:  # Thermal
-            if sensor_data['temperature'] > 30:
-                reasons.append("High temperature excellent for thermal energy")
-            if sensor_data['wind_speed'] > 5:
-                reasons.append("Wind conditions support thermal efficiency")
-            if sensor_data['power_demand'] > 150:
-                reasons.append("High power demand suits thermal stability")
-                
+            reason_bits = ((reading.temperature > THERMAL_EXCELLENT_TEMP)
+                           | (reading.wind_speed > THERMAL_MIN_WIND) << 1
+                           | (reading.power_demand > HIGH_POWER_DEMAND) << 2)
         else:  # Battery
-            if sensor_data['time_of_day'] < 6 or sensor_data['time_of_day'] > 18:
-                reasons.append("Night time favors battery usage")
-            if sensor_data['solar_irradiance'] < 100:
-                reasons.append("Low solar availability requires battery backup")
-            if sensor_data['battery_level'] > 80:
-                reasons.append("High battery level available for use")
+            reason_bits = ((time_of_day < DAYTIME_START or time_of_day > DAYTIME_END)
+                           | (reading.solar_irradiance < SOLAR_MIN_IRRADIANCE) << 1
+                           | (reading.battery_level > BATTERY_HIGH_LEVEL) << 2)
         
-        return reasons if reasons else ["Default decision based on current conditions"]
+        return self._REASON_TABLE[prediction][reason_bits]
     
-    def _analyze_sensors(self, sensor_data):
+    def _analyze_sensors(self, reading: Reading) -> Dict[str, str]:
         """Analyze individual sensor readings."""
-        analysis = {}
-        
-        # Solar analysis
-        irradiance = sensor_data['solar_irradiance']
-        if irradiance > 600:
-            analysis['solar'] = "Excellent"
-        elif irradiance > 300:
-            analysis['solar'] = "Good"
-        elif irradiance > 100:
-            analysis['solar'] = "Fair"
-        else:
-            analysis['solar'] = "Poor"
-            
-        # Thermal analysis
-        temp = sensor_data['temperature']
-        if temp > 30:
-            analysis['thermal'] = "Excellent"
-        elif temp > 25:
-            analysis['thermal'] = "Good"
-        else:
-            analysis['thermal'] = "Fair"
-            
-        # Battery analysis
-        battery = sensor_data['battery_level']
-        if battery > 80:
-            analysis['battery'] = "Excellent"
-        elif battery > 50:
-            analysis['battery'] = "Good"
-        elif battery > 20:
-            analysis['battery'] = "Fair"
-        else:
-            analysis['battery'] = "Critical"
-            
-        return analysis
+        return {
+            'solar': _SOLAR_RATINGS[bisect_left(_SOLAR_BOUNDS, reading.solar_irradiance)],
+            'thermal': _THERMAL_RATINGS[bisect_left(_THERMAL_BOUNDS, reading.temperature)],
+            'battery': _BATTERY_RATINGS[bisect_left(_BATTERY_BOUNDS, reading.battery_level)]
+        }
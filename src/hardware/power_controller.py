@@ -6,53 +6,133 @@ Controls power relays for switching between energy sources.
 Manages solar, thermal, and battery power switching with safety protocols.
 """
 
+import os
+import sys
 import time
 import logging
+import threading
+from functools import lru_cache, partial, wraps
 
-# Hardware-specific imports (commented for development)
+# Cheap probe for Raspberry Pi GPIO; the libraries themselves are imported
+# lazily by init_hardware so simulation runs never touch GPIO sysfs
+HARDWARE_AVAILABLE = os.path.exists('/dev/gpiomem')
+
+# Optional pigpio daemon client for single-write GPIO bank updates
 try:
-    import RPi.GPIO as GPIO
-    HARDWARE_AVAILABLE = True
+    import pigpio
+    PIGPIO_AVAILABLE = True
 except ImportError:
-    HARDWARE_AVAILABLE = False
-    print("Hardware libraries not available - using simulation mode")
+    PIGPIO_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+
+@lru_cache(maxsize=None)
+def _load_hw_modules():
+    """Import the relay GPIO library on first use."""
+    GPIO = sys.modules.get('RPi.GPIO')
+    if GPIO is None:
+        import RPi.GPIO as GPIO
+    return GPIO
+
+
+# Relay-controlled energy sources, and their bits in the relay state mask
+SOURCES = ('solar', 'thermal', 'battery')
+SOURCE_BITS = {'solar': 1, 'thermal': 2, 'battery': 4}
+_SOURCE_BY_BIT = {bit: source for source, bit in SOURCE_BITS.items()}
+
+# Break-before-make safety gaps (seconds)
+SWITCH_DELAY = 0.1
+EMERGENCY_SWITCH_DELAY = 0.05
+
+# Time each relay is held on, then off, during the relay self-test (seconds)
+RELAY_TEST_HOLD = 0.5
+
+
+def _precise_sleep(duration):
+    """Sleep for `duration` seconds, spinning on perf_counter for the final millisecond."""
+    deadline = time.perf_counter() + duration
+    if duration > 0.002:
+        time.sleep(duration - 0.001)
+    while time.perf_counter() < deadline:
+        pass
+
+
+def _serialized(method):
+    """Run a relay-operating method under the controller's lock."""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
 class PowerController:
     """Manages power switching between energy sources."""
     
+    __slots__ = ('config', 'hardware_available', 'gpio_pins', '_relay_mask',
+                 '_pin_solar', '_pin_thermal', '_pin_battery', '_pin_emergency',
+                 '_all_relay_mask', '_gpio', 'pi', '_gpio_set', '_gpio_clear',
+                 '_switch_table', 'last_switch_time', '_lock', 'emergency_callback')
+    
     def __init__(self, config):
         """Initialize power controller."""
         self.config = config
         self.hardware_available = HARDWARE_AVAILABLE and not config.get('simulation_mode', True)
         
         # GPIO pin assignments
+        self._pin_solar = config.get('gpio.solar_relay', 18)
+        self._pin_thermal = config.get('gpio.thermal_relay', 19)
+        self._pin_battery = config.get('gpio.battery_relay', 20)
+        self._pin_emergency = config.get('gpio.emergency_shutdown', 21)
         self.gpio_pins = {
-            'solar': config.get('gpio.solar_relay', 18),
-            'thermal': config.get('gpio.thermal_relay', 19),
-            'battery': config.get('gpio.battery_relay', 20),
-            'emergency': config.get('gpio.emergency_shutdown', 21)
+            'solar': self._pin_solar,
+            'thermal': self._pin_thermal,
+            'battery': self._pin_battery,
+            'emergency': self._pin_emergency
         }
         
-        # Current relay states
-        self.relay_states = {
-            'solar': False,
-            'thermal': False,
-            'battery': True  # Default to battery for safety
-        }
+        # GPIO bank bitmask covering every source relay
+        self._all_relay_mask = 0
+        for source in SOURCES:
+            self._all_relay_mask |= 1 << self.gpio_pins[source]
+        self._gpio = None
+        self.pi = None
+        
+        # Per-source relay writers, bound to their pins once GPIO is loaded
+        self._gpio_set = {}
+        self._gpio_clear = {}
+        
+        # Current relay states as a SOURCE_BITS mask
+        self._relay_mask = SOURCE_BITS['battery']  # Default to battery for safety
+        self.last_switch_time = None
+        
+        # Serializes relay operations between the control loop and the GPIO callback thread
+        self._lock = threading.RLock()
+        
+        # Called with no arguments when the emergency button is pressed; the owner
+        # sets it so the press goes through its own emergency handling
+        self.emergency_callback = None
         
         # Initialize hardware if available
         if self.hardware_available:
             self.init_hardware()
         else:
             logger.warning("Running in simulation mode - no actual relay control")
+        
+        # Switch closures for the backend that ended up active
+        self._switch_table = self._build_switch_table()
     
     def init_hardware(self):
         """Initialize GPIO pins for relay control."""
         try:
+            GPIO = self._gpio = _load_hw_modules()
             GPIO.setmode(GPIO.BCM)
             GPIO.setwarnings(False)
+            self._gpio_set = {source: partial(GPIO.output, self.gpio_pins[source], GPIO.HIGH)
+                              for source in SOURCES}
+            self._gpio_clear = {source: partial(GPIO.output, self.gpio_pins[source], GPIO.LOW)
+                                for source in SOURCES}
             
             # Setup relay control pins
             for source, pin in self.gpio_pins.items():
@@ -62,6 +142,18 @@ class PowerController:
                 else:
                     GPIO.setup(pin, GPIO.IN, pull_up_down=GPIO.PUD_UP)  # Emergency button
             
+            # React to the emergency button on its falling edge instead of waiting to be polled
+            GPIO.add_event_detect(self._pin_emergency, GPIO.FALLING,
+                                  callback=self._on_emergency_button,
+                                  bouncetime=self.config.get('gpio.emergency_debounce_ms', 200))
+            
+            # Connect to the pigpio daemon for bank writes, if it is running
+            if PIGPIO_AVAILABLE:
+                self.pi = pigpio.pi()
+                if not self.pi.connected:
+                    logger.warning("pigpio daemon not running - relays will be switched pin by pin")
+                    self.pi = None
+            
             # Set default state (battery only)
             self.activate_source('battery')
             
@@ -71,6 +163,7 @@ class PowerController:
             logger.error(f"Failed to initialize power controller hardware: {e}")
             self.hardware_available = False
     
+    @_serialized
     def switch_source(self, from_source, to_source):
         """
         Switch from one energy source to another.
@@ -102,30 +195,93 @@ class PowerController:
     
     def _perform_switch(self, from_source, to_source):
         """Perform the actual relay switching with safety delays."""
+        switch = self._switch_table.get((from_source, to_source))
+        if switch is not None:
+            return switch()
         
         # Step 1: Deactivate current source (break)
-        if from_source in self.relay_states:
+        if from_source in SOURCE_BITS:
             self.deactivate_source(from_source)
             
         # Step 2: Safety delay to prevent arcing
-        time.sleep(0.1)
+        _precise_sleep(SWITCH_DELAY)
         
         # Step 3: Activate new source (make)
         success = self.activate_source(to_source)
         
         return success
     
+    def _build_switch_table(self):
+        """Map every (from, to) source pair to a break-before-make closure for the active backend."""
+        return {(from_source, to_source): self._make_switch_fn(from_source, to_source)
+                for from_source in SOURCES for to_source in SOURCES
+                if from_source != to_source}
+    
+    def _make_switch_fn(self, from_source, to_source):
+        """Build a switch closure with its pins, masks and GPIO calls bound up front."""
+        keep_mask = ~SOURCE_BITS[from_source]
+        to_bit = SOURCE_BITS[to_source]
+        message = f"Switched {from_source} relay to {to_source} relay"
+        
+        if self.hardware_available and self.pi is not None:
+            # Gap timed by pigpio's DMA waveform engine
+            pulses = [
+                pigpio.pulse(0, 1 << self.gpio_pins[from_source], int(SWITCH_DELAY * 1e6)),  # break, then wait
+                pigpio.pulse(1 << self.gpio_pins[to_source], 0, 0)                          # make
+            ]
+            
+            def switch():
+                self._send_wave(pulses)
+                self._relay_mask = (self._relay_mask & keep_mask) | to_bit
+                logger.debug(message)
+                return True
+        elif self.hardware_available:
+            clear = self._gpio_clear[from_source]
+            set_ = self._gpio_set[to_source]
+            
+            def switch():
+                clear()
+                self._relay_mask &= keep_mask
+                _precise_sleep(SWITCH_DELAY)
+                set_()
+                self._relay_mask |= to_bit
+                logger.debug(message)
+                return True
+        else:
+            def switch():
+                self._relay_mask &= keep_mask
+                _precise_sleep(SWITCH_DELAY)
+                self._relay_mask |= to_bit
+                logger.debug(message)
+                return True
+        
+        return switch
+    
+    def _send_wave(self, pulses):
+        """Transmit a one-shot pigpio waveform and wait for it to finish."""
+        pi = self.pi
+        pi.wave_add_new()
+        pi.wave_add_generic(pulses)
+        wave_id = pi.wave_create()
+        try:
+            pi.wave_send_once(wave_id)
+            while pi.wave_tx_busy():
+                time.sleep(0.01)
+        finally:
+            pi.wave_delete(wave_id)
+    
+    @_serialized
     def activate_source(self, source):
         """Activate a specific energy source."""
-        if source not in self.gpio_pins or source == 'emergency':
+        if source not in SOURCE_BITS:
             logger.error(f"Invalid energy source: {source}")
             return False
         
         try:
             if self.hardware_available:
-                GPIO.output(self.gpio_pins[source], GPIO.HIGH)
+                self._gpio_set[source]()
             
-            self.relay_states[source] = True
+            self._relay_mask |= SOURCE_BITS[source]
             logger.debug(f"Activated {source} relay")
             return True
             
@@ -133,17 +289,18 @@ class PowerController:
             logger.error(f"Error activating {source}: {e}")
             return False
     
+    @_serialized
     def deactivate_source(self, source):
         """Deactivate a specific energy source."""
-        if source not in self.gpio_pins or source == 'emergency':
+        if source not in SOURCE_BITS:
             logger.error(f"Invalid energy source: {source}")
             return False
         
         try:
             if self.hardware_available:
-                GPIO.output(self.gpio_pins[source], GPIO.LOW)
+                self._gpio_clear[source]()
             
-            self.relay_states[source] = False
+            self._relay_mask &= ~SOURCE_BITS[source]
             logger.debug(f"Deactivated {source} relay")
             return True
             
@@ -151,19 +308,17 @@ class PowerController:
             logger.error(f"Error deactivating {source}: {e}")
             return False
     
+    @_serialized
     def emergency_switch(self, safe_source='battery'):
         """Emergency switch to safe source (usually battery)."""
         logger.critical(f"EMERGENCY SWITCH to {safe_source}")
         
         try:
             # Immediately deactivate all sources
-            for source in ['solar', 'thermal', 'battery']:
-                if self.hardware_available:
-                    GPIO.output(self.gpio_pins[source], GPIO.LOW)
-                self.relay_states[source] = False
+            self._clear_all_relays()
             
             # Brief safety delay
-            time.sleep(0.05)
+            _precise_sleep(EMERGENCY_SWITCH_DELAY)
             
             # Activate safe source
             if safe_source:
@@ -174,9 +329,26 @@ class PowerController:
         except Exception as e:
             logger.critical(f"CRITICAL ERROR in emergency switch: {e}")
     
+    def _clear_all_relays(self):
+        """Switch every source relay off, simultaneously when pigpio is available."""
+        if self.hardware_available:
+            if self.pi is not None:
+                self.pi.clear_bank_1(self._all_relay_mask)
+            else:
+                for clear in self._gpio_clear.values():
+                    clear()
+        
+        self._relay_mask = 0
+    
+    @property
+    def relay_states(self):
+        """Current relay states as a {source: bool} dict."""
+        return self.get_relay_states()
+    
     def get_relay_states(self):
         """Get current relay states."""
-        return self.relay_states.copy()
+        mask = self._relay_mask
+        return {source: bool(mask & bit) for source, bit in SOURCE_BITS.items()}
     
     def check_emergency_button(self):
         """Check if emergency stop button is pressed."""
@@ -185,17 +357,32 @@ class PowerController:
         
         try:
             # Emergency button is active low (pressed = False)
-            button_state = GPIO.input(self.gpio_pins['emergency'])
+            button_state = self._gpio.input(self._pin_emergency)
             return not button_state  # Return True if button is pressed
             
         except Exception as e:
             logger.error(f"Error checking emergency button: {e}")
             return False
     
+    def _on_emergency_button(self, channel):
+        """GPIO interrupt handler for the emergency stop button."""
+        logger.critical(f"Emergency button pressed (GPIO {channel})")
+        if self.emergency_callback is not None:
+            self.emergency_callback()
+        else:
+            self.emergency_switch('battery')
+    
+    @_serialized
     def test_relays(self):
         """Test all relays for proper operation."""
         logger.info("Testing all relays")
         
+        if self.pi is not None and self.hardware_available:
+            test_results = self._wave_test_relays()
+            self.activate_source('battery')
+            logger.info(f"Relay test results: {test_results}")
+            return test_results
+        
         test_results = {}
         
         for source in ['solar', 'thermal', 'battery']:
@@ -203,12 +390,12 @@ class PowerController:
                 # Test activation
                 logger.debug(f"Testing {source} relay activation")
                 activate_success = self.activate_source(source)
-                time.sleep(0.5)
+                time.sleep(RELAY_TEST_HOLD)
                 
                 # Test deactivation
                 logger.debug(f"Testing {source} relay deactivation")
                 deactivate_success = self.deactivate_source(source)
-                time.sleep(0.5)
+                time.sleep(RELAY_TEST_HOLD)
                 
                 test_results[source] = activate_success and deactivate_success
                 
@@ -222,6 +409,48 @@ class PowerController:
         logger.info(f"Relay test results: {test_results}")
         return test_results
     
+    def _wave_test_relays(self):
+        """
+        Pulse each relay in turn from a single pigpio waveform, confirming
+        from GPIO bank reads that every pin actually went high and back low.
+        """
+        pi = self.pi
+        hold_us = int(RELAY_TEST_HOLD * 1e6)
+        pulses = []
+        for source in SOURCES:
+            mask = 1 << self.gpio_pins[source]
+            pulses.append(pigpio.pulse(mask, 0, hold_us))
+            pulses.append(pigpio.pulse(0, mask, hold_us))
+        
+        self._clear_all_relays()
+        try:
+            pi.wave_add_new()
+            pi.wave_add_generic(pulses)
+            wave_id = pi.wave_create()
+        except Exception as e:
+            logger.error(f"Error building relay test waveform: {e}")
+            return {source: False for source in SOURCES}
+        
+        # Sample the bank well inside each hold period to catch every pin going high
+        seen_high = 0
+        try:
+            pi.wave_send_once(wave_id)
+            while pi.wave_tx_busy():
+                seen_high |= pi.read_bank_1()
+                time.sleep(RELAY_TEST_HOLD / 5)
+            levels = pi.read_bank_1()
+        except Exception as e:
+            logger.error(f"Error running relay test waveform: {e}")
+            return {source: False for source in SOURCES}
+        finally:
+            pi.wave_delete(wave_id)
+        
+        test_results = {}
+        for source in SOURCES:
+            mask = 1 << self.gpio_pins[source]
+            test_results[source] = bool(seen_high & mask) and not levels & mask
+        return test_results
+    
     def get_power_status(self):
         """Get comprehensive power system status."""
         status = {
@@ -229,32 +458,32 @@ class PowerController:
             'relay_states': self.get_relay_states(),
             'active_source': self._get_active_source(),
             'emergency_button_pressed': self.check_emergency_button(),
-            'last_switch_time': getattr(self, 'last_switch_time', None)
+            'last_switch_time': self.last_switch_time
         }
         
         return status
     
     def _get_active_source(self):
         """Determine which source is currently active."""
-        active_sources = [source for source, state in self.relay_states.items() if state]
+        mask = self._relay_mask
         
-        if len(active_sources) == 1:
-            return active_sources[0]
-        elif len(active_sources) == 0:
-            return None
-        else:
+        # More than one bit set means more than one relay is closed
+        if mask & (mask - 1):
+            active_sources = [source for source, bit in SOURCE_BITS.items() if mask & bit]
             logger.warning(f"Multiple sources active: {active_sources}")
             return 'multiple'
+        
+        return _SOURCE_BY_BIT.get(mask)
     
+    @_serialized
     def force_source(self, source):
         """Force activation of specific source (override AI decision)."""
         logger.warning(f"Forcing activation of {source} source")
         
         # Deactivate all sources first
-        for src in ['solar', 'thermal', 'battery']:
-            self.deactivate_source(src)
+        self._clear_all_relays()
         
-        time.sleep(0.1)
+        _precise_sleep(SWITCH_DELAY)
         
         # Activate requested source
         success = self.activate_source(source)
@@ -277,7 +506,9 @@ class PowerController:
             
             # Clean up GPIO
             if self.hardware_available:
-                GPIO.cleanup()
+                if self.pi is not None:
+                    self.pi.stop()
+                self._gpio.cleanup()
                 
         except Exception as e:
             logger.error(f"Error during power controller cleanup: {e}")
@@ -9,39 +9,200 @@ Manages all sensor readings for the dual energy system including:
 - Environmental sensors (ambient temperature, humidity)
 """
 
+import os
+import sys
 import time
 import threading
 import logging
-import random
 import math
-from datetime import datetime
+from collections import deque
+from collections.abc import Mapping
+from dataclasses import dataclass, fields
+from functools import lru_cache
+from datetime import date, datetime
+from typing import Optional
 import json
 
-# Hardware-specific imports (commented for development, uncomment for deployment)
-try:
-    import RPi.GPIO as GPIO
+import numpy as np
+
+# Cheap probe for Raspberry Pi GPIO; the sensor libraries themselves are
+# imported lazily by init_hardware so simulation runs never pay for them
+HARDWARE_AVAILABLE = os.path.exists('/dev/gpiomem')
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=None)
+def _load_hw_modules():
+    """Import the GPIO, I2C/ADC and 1-Wire sensor libraries on first use."""
+    GPIO = sys.modules.get('RPi.GPIO')
+    if GPIO is None:
+        import RPi.GPIO as GPIO
     import board
     import busio
     import adafruit_ads1x15.ads1115 as ADS
     from adafruit_ads1x15.analog_in import AnalogIn
     from w1thermsensor import W1ThermSensor
-    HARDWARE_AVAILABLE = True
-except ImportError:
-    HARDWARE_AVAILABLE = False
-    print("Hardware libraries not available - using simulation mode")
+    return GPIO, board, busio, ADS, AnalogIn, W1ThermSensor
+
+
+# dataclass(slots=True) needs Python 3.10+
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(frozen=True, **_SLOTS)
+class SensorReading(Mapping):
+    """
+    Immutable snapshot of one sensor tick.
+    Also readable as a mapping of field name to value; fields a sensor
+    backend does not provide (None) are left out of the mapping, and the
+    legacy alias keys resolve to their canonical fields without being stored.
+    The tick time is kept as a Unix float and only formatted as an ISO
+    string when `timestamp` is read, e.g. when the reading is serialized.
+    """
+    solar_voltage: float
+    solar_current: float
+    solar_power: float
+    thermal_voltage: float
+    thermal_current: float
+    thermal_temperature: float
+    battery_voltage: float
+    battery_current: float
+    battery_soc: float
+    battery_temperature: float
+    ambient_temperature: float
+    humidity: float
+    hour_of_day: int
+    day_of_year: int
+    load_demand: float
+    ts_unix: float
+    solar_irradiance: Optional[float] = None
+    wind_speed: Optional[float] = None
+    simulation_mode: bool = False
+    
+    # Aliases kept for compatibility with older consumers
+    @property
+    def battery_level(self):
+        return self.battery_soc
+    
+    @property
+    def temperature(self):
+        return self.ambient_temperature
+    
+    @property
+    def time_of_day(self):
+        return self.hour_of_day
+    
+    @property
+    def power_demand(self):
+        return self.load_demand
+    
+    @property
+    def timestamp(self):
+        """ISO-8601 local time of the reading."""
+        return datetime.fromtimestamp(self.ts_unix).isoformat()
+    
+    def __getitem__(self, key):
+        name = _READING_KEYS.get(key)
+        if name is not None:
+            value = getattr(self, name)
+            if value is not None:
+                return value
+        raise KeyError(key)
+    
+    def __iter__(self):
+        return (key for key, name in _READING_ITEMS if getattr(self, name) is not None)
+    
+    def __len__(self):
+        return sum(1 for _ in self)
+    
+    def as_dict(self):
+        """Plain dict copy for JSON serialization."""
+        return dict(self)
+
+
+_READING_FIELDS = tuple(field.name for field in fields(SensorReading))
+
+# (mapping key, backing field) pairs; the raw ts_unix field is exposed as the formatted timestamp
+_READING_ITEMS = tuple(('timestamp' if name == 'ts_unix' else name, name) for name in _READING_FIELDS)
+
+# Every key a SensorReading answers to, mapped to its field; legacy aliases included
+_READING_KEYS = {name: name for name in _READING_FIELDS}
+_READING_KEYS.update({
+    'battery_level': 'battery_soc',
+    'temperature': 'ambient_temperature',
+    'time_of_day': 'hour_of_day',
+    'power_demand': 'load_demand',
+    'timestamp': 'timestamp'
+})
+
+
+# Daily cycles, precomputed per hour of day
+_SOLAR_FACTOR_BY_HOUR = tuple(max(0, math.sin((hour - 6) * math.pi / 12)) if 6 <= hour <= 18 else 0
+                              for hour in range(24))
+_LOAD_BASE_BY_HOUR = tuple(80 + 40 * (0.5 + 0.5 * math.sin((hour - 6) * math.pi / 12))
+                           for hour in range(24))
+_AMBIENT_BASE_BY_HOUR = tuple(20 + 10 * math.sin((hour - 12) * math.pi / 12) for hour in range(24))
+
+
+# ADS1115 sampling: continuous conversion at the fastest data rate, with the
+# background sampler refreshing every channel this often (seconds)
+ADC_DATA_RATE = 860
+ADC_SAMPLE_PERIOD = 0.05
+
+# Voltage divider ratios for the solar, thermal and battery ADC channels
+_ADC_SCALES = (5.0, 3.0, 4.0)
+
+# Hardware channels still read as placeholder noise, drawn as one batch per tick:
+# solar/thermal/battery current, thermal/battery/ambient temperature, humidity, load offset
+_HW_NOISE_LOW = np.array([0.5, 0.5, 0.5, 40, 20, 15, 40, -10])
+_HW_NOISE_SPAN = np.array([2.5, 2.5, 2.5, 40, 15, 20, 40, 20])
+_CURRENT_NOISE_INDEX = {'solar': 0, 'thermal': 1, 'battery': 2}
+
+
+def _day_of_year(now):
+    """Day of the year for a datetime, without building a struct_time."""
+    return now.toordinal() - date(now.year, 1, 1).toordinal() + 1
 
-logger = logging.getLogger(__name__)
 
 class SensorManager:
     """Manages all sensor readings for the energy system."""
     
+    __slots__ = ('config', 'hardware_available', 'monitoring', 'sensor_thread',
+                 'latest_readings', '_stop_event', '_read_interval', '_reading_pool',
+                 '_next_log_ts', '_rng',
+                 # Hardware mode
+                 'ads', 'solar_voltage_chan', 'thermal_voltage_chan',
+                 'battery_voltage_chan', 'temp_sensors', '_adc_voltages',
+                 '_adc_thread', '_adc_stop', '_hw_noise',
+                 # Simulation mode
+                 'sim_time_start', 'sim_params', '_sin_freqs', '_noise_low',
+                 '_noise_span', '_round_scales', '_sim_buf')
+    
     def __init__(self, config):
         """Initialize sensor manager."""
         self.config = config
         self.hardware_available = HARDWARE_AVAILABLE and not config.get('simulation_mode', True)
         self.monitoring = False
         self.sensor_thread = None
-        self.latest_readings = {}
+        self._stop_event = threading.Event()
+        self._read_interval = config.get('sensor_read_interval', 1)
+        
+        # Latest scaled ADC voltages (solar, thermal, battery), kept fresh by the sampler thread
+        self._adc_voltages = [0.0, 0.0, 0.0]
+        self._adc_thread = None
+        self._adc_stop = threading.Event()
+        self.latest_readings = None
+        
+        # Shared PCG64 generator, plus this tick's batch of placeholder hardware noise
+        self._rng = np.random.default_rng()
+        self._hw_noise = None
+        
+        # Reusable scratch dicts the readers fill before a SensorReading is built
+        self._reading_pool = deque(maxlen=4)
+        
+        # Monotonic deadline for the next periodic readings log line
+        self._next_log_ts = time.monotonic() + 60
         
         # Initialize hardware if available
         if self.hardware_available:
@@ -55,6 +216,8 @@ class SensorManager:
         logger.info("Initializing hardware sensors")
         
         try:
+            GPIO, board, busio, ADS, AnalogIn, W1ThermSensor = _load_hw_modules()
+            
             # Initialize GPIO
             GPIO.setmode(GPIO.BCM)
             GPIO.setwarnings(False)
@@ -62,12 +225,20 @@ class SensorManager:
             # Initialize I2C and ADC
             i2c = busio.I2C(board.SCL, board.SDA)
             self.ads = ADS.ADS1115(i2c)
+            self.ads.mode = ADS.Mode.CONTINUOUS
+            self.ads.data_rate = ADC_DATA_RATE
             
             # Define analog input channels for voltage measurements
             self.solar_voltage_chan = AnalogIn(self.ads, ADS.P0)
             self.thermal_voltage_chan = AnalogIn(self.ads, ADS.P1)
             self.battery_voltage_chan = AnalogIn(self.ads, ADS.P2)
             
+            # Fill the voltage cache once, then keep it fresh in the background
+            self._sample_adc()
+            self._adc_stop.clear()
+            self._adc_thread = threading.Thread(target=self._adc_sampling_loop, daemon=True)
+            self._adc_thread.start()
+            
             # Initialize temperature sensors
             self.temp_sensors = W1ThermSensor.get_available_sensors()
             
@@ -79,6 +250,35 @@ class SensorManager:
             self.hardware_available = False
             self.init_simulation()
     
+    def _sample_adc(self):
+        """Read every ADC channel once into the voltage cache."""
+        channels = (self.solar_voltage_chan, self.thermal_voltage_chan, self.battery_voltage_chan)
+        for i, (chan, scale) in enumerate(zip(channels, _ADC_SCALES)):
+            self._adc_voltages[i] = chan.voltage * scale
+    
+    def _adc_sampling_loop(self):
+        """Background loop rotating the ADC multiplexer over the voltage channels."""
+        while not self._adc_stop.wait(ADC_SAMPLE_PERIOD):
+            try:
+                self._sample_adc()
+            except Exception as e:
+                logger.error(f"Error sampling ADC: {e}")
+    
+    @property
+    def solar_voltage(self):
+        """Latest solar panel voltage from the ADC cache."""
+        return self._adc_voltages[0]
+    
+    @property
+    def thermal_voltage(self):
+        """Latest thermal generator voltage from the ADC cache."""
+        return self._adc_voltages[1]
+    
+    @property
+    def battery_voltage(self):
+        """Latest battery voltage from the ADC cache."""
+        return self._adc_voltages[2]
+    
     def init_simulation(self):
         """Initialize simulation mode."""
         logger.info("Initializing sensor simulation")
@@ -92,6 +292,18 @@ class SensorManager:
             'noise_level': 0.1
         }
         
+        # Slow solar, thermal and humidity drifts, evaluated together each reading
+        self._sin_freqs = np.array([1 / 3600, 1 / 7200, 1 / 5400])
+        
+        # Uniform noise bounds for every simulated channel, drawn as one batch
+        self._noise_low = np.array([-50, -0.5, -0.3, -5, -1, -5, -0.2, -0.5, -3, -2, -10, -20, 0])
+        self._noise_span = np.array([50, 0.5, 0.3, 5, 1, 5, 0.2, 0.5, 8, 2, 10, 20, 15]) - self._noise_low
+        
+        # Output values are rounded together to 2 or 1 decimals
+        self._round_scales = np.array([100, 100, 100, 10, 100, 100, 10,
+                                       100, 100, 10, 10, 10, 10, 10, 10])
+        self._sim_buf = np.empty(len(self._round_scales))
+        
     def start_monitoring(self):
         """Start continuous sensor monitoring."""
         if self.monitoring:
@@ -100,6 +312,7 @@ class SensorManager:
             
         logger.info("Starting sensor monitoring")
         self.monitoring = True
+        self._stop_event.clear()
         
         # Start monitoring thread
         self.sensor_thread = threading.Thread(target=self._monitoring_loop, daemon=True)
@@ -109,58 +322,73 @@ class SensorManager:
         """Stop sensor monitoring."""
         logger.info("Stopping sensor monitoring")
         self.monitoring = False
+        self._stop_event.set()
         
         if self.sensor_thread:
             self.sensor_thread.join(timeout=2)
     
     def _monitoring_loop(self):
         """Main monitoring loop."""
-        while self.monitoring:
+        stop_event = self._stop_event
+        while not stop_event.is_set():
             try:
-                # Read all sensors
-                readings = self.read_all_sensors()
+                # Read all sensors against a single clock reading for this tick
+                readings = self.read_all_sensors(datetime.now())
                 
                 # Update latest readings
                 self.latest_readings = readings
                 
                 # Log readings periodically
-                if time.time() % 60 < 1:  # Every minute
+                tick = time.monotonic()
+                if tick >= self._next_log_ts:  # Every minute
+                    self._next_log_ts = tick + 60
                     logger.debug(f"Sensor readings: {readings}")
                 
-                # Wait before next reading
-                time.sleep(self.config.get('sensor_read_interval', 1))
-                
             except Exception as e:
                 logger.error(f"Error in monitoring loop: {e}")
-                time.sleep(1)
+            
+            # Wait before next reading; returns early once stop_monitoring is called
+            stop_event.wait(self._read_interval)
     
-    def read_all_sensors(self):
-        """Read all sensor values."""
+    def read_all_sensors(self, now=None):
+        """Read all sensor values, timestamped at `now` (default: current time)."""
+        if now is None:
+            now = datetime.now()
+        
+        # Borrow a scratch dict from the pool; deque pop/append are thread safe
+        try:
+            values = self._reading_pool.pop()
+        except IndexError:
+            values = {}
+        
         if self.hardware_available:
-            return self._read_hardware_sensors()
+            self._read_hardware_sensors(now, values)
         else:
-            return self._read_simulated_sensors()
+            self._read_simulated_sensors(now, values)
+        
+        reading = SensorReading(**values)
+        self._reading_pool.append(values)
+        return reading
     
-    def _read_hardware_sensors(self):
-        """Read actual hardware sensors."""
-        readings = {}
+    def _read_hardware_sensors(self, now, readings):
+        """Read actual hardware sensors into the `readings` dict."""
+        readings.clear()
         
         try:
+            self._hw_noise = (_HW_NOISE_LOW + _HW_NOISE_SPAN * self._rng.random(len(_HW_NOISE_LOW))).tolist()
+            
             # Solar panel readings
-            solar_voltage_raw = self.solar_voltage_chan.voltage
-            readings['solar_voltage'] = solar_voltage_raw * 5.0  # Scale for voltage divider
+            readings['solar_voltage'] = self.solar_voltage
             readings['solar_current'] = self._read_current_sensor('solar')
             readings['solar_power'] = readings['solar_voltage'] * readings['solar_current']
             
             # Thermal readings
-            thermal_voltage_raw = self.thermal_voltage_chan.voltage
-            readings['thermal_voltage'] = thermal_voltage_raw * 3.0
+            readings['thermal_voltage'] = self.thermal_voltage
             readings['thermal_current'] = self._read_current_sensor('thermal')
             readings['thermal_temperature'] = self._read_thermal_temperature()
             
             # Battery readings
-            battery_voltage_raw = self.battery_voltage_chan.voltage
-            readings['battery_voltage'] = battery_voltage_raw * 4.0
+            readings['battery_voltage'] = self.battery_voltage
             readings['battery_current'] = self._read_current_sensor('battery')
             readings['battery_temperature'] = self._read_battery_temperature()
             readings['battery_soc'] = self._calculate_battery_soc(readings['battery_voltage'])
@@ -170,120 +398,132 @@ class SensorManager:
             readings['humidity'] = self._read_humidity()
             
             # Calculated values
-            readings['hour_of_day'] = datetime.now().hour
-            readings['day_of_year'] = datetime.now().timetuple().tm_yday
-            readings['load_demand'] = self._calculate_load_demand()
+            readings['hour_of_day'] = now.hour
+            readings['day_of_year'] = _day_of_year(now)
+            readings['load_demand'] = self._calculate_load_demand(now.hour)
             
             # Add timestamp
-            readings['timestamp'] = datetime.now().isoformat()
+            readings['ts_unix'] = now.timestamp()
             
         except Exception as e:
             logger.error(f"Error reading hardware sensors: {e}")
             # Fall back to simulation if hardware fails
-            readings = self._read_simulated_sensors()
-        
-        return readings
+            self._read_simulated_sensors(now, readings)
     
-    def _read_simulated_sensors(self):
-        """Generate realistic simulated sensor readings."""
-        current_time = time.time()
-        elapsed = current_time - self.sim_time_start
-        hour = datetime.now().hour
-        day = datetime.now().timetuple().tm_yday
+    def _read_simulated_sensors(self, now, readings):
+        """Generate realistic simulated sensor readings into the `readings` dict."""
+        ts_unix = now.timestamp()
+        elapsed = ts_unix - self.sim_time_start
+        hour = now.hour
+        day = _day_of_year(now)
+        
+        # Evaluate the drift sine terms and draw all noise in one NumPy call each
+        solar_wave, thermal_wave, humidity_wave = np.sin(self._sin_freqs * elapsed).tolist()
+        
+        noise = self._noise_low + self._noise_span * self._rng.random(len(self._noise_span))
+        (irradiance_noise, solar_voltage_noise, solar_current_noise, thermal_temp_noise,
+         thermal_voltage_noise, battery_soc_noise, battery_voltage_noise, battery_current_noise,
+         battery_temp_noise, ambient_temp_noise, humidity_noise, load_noise,
+         wind_speed) = noise.tolist()
         
         # Solar simulation (varies with time of day and some randomness)
-        solar_factor = max(0, math.sin((hour - 6) * math.pi / 12)) if 6 <= hour <= 18 else 0
+        solar_factor = _SOLAR_FACTOR_BY_HOUR[hour]
         solar_irradiance = (500 + 300 * solar_factor + 
-                           random.uniform(-50, 50) + 
-                           100 * math.sin(elapsed / 3600))  # Slow variation
+                           irradiance_noise + 
+                           100 * solar_wave)  # Slow variation
         
-        solar_voltage = 12.0 + 2.0 * solar_factor + random.uniform(-0.5, 0.5)
-        solar_current = max(0, 2.0 * solar_factor + random.uniform(-0.3, 0.3))
+        solar_voltage = 12.0 + 2.0 * solar_factor + solar_voltage_noise
+        solar_current = max(0, 2.0 * solar_factor + solar_current_noise)
         
         # Thermal simulation (more stable, temperature dependent)
-        thermal_temp = 40 + 20 * math.sin(elapsed / 7200) + random.uniform(-5, 5)
-        thermal_voltage = max(0, (thermal_temp - 30) * 0.3 + random.uniform(-1, 1))
+        thermal_temp = 40 + 20 * thermal_wave + thermal_temp_noise
+        thermal_voltage = max(0, (thermal_temp - 30) * 0.3 + thermal_voltage_noise)
         thermal_current = thermal_voltage * 0.8 if thermal_voltage > 3 else 0
         
         # Battery simulation (slowly decreases unless charging)
         battery_base = 75 - (elapsed / 36000) % 60  # Slow discharge cycle
-        battery_soc = max(20, min(100, battery_base + random.uniform(-5, 5)))
-        battery_voltage = 10.5 + (battery_soc / 100) * 3.0 + random.uniform(-0.2, 0.2)
-        battery_current = 1.5 + random.uniform(-0.5, 0.5)
-        battery_temp = 25 + random.uniform(-3, 8)
+        battery_soc = max(20, min(100, battery_base + battery_soc_noise))
+        battery_voltage = 10.5 + (battery_soc / 100) * 3.0 + battery_voltage_noise
+        battery_current = 1.5 + battery_current_noise
+        battery_temp = 25 + battery_temp_noise
         
         # Environmental simulation
-        ambient_temp = 20 + 10 * math.sin((hour - 12) * math.pi / 12) + random.uniform(-2, 2)
-        humidity = 50 + 20 * math.sin(elapsed / 5400) + random.uniform(-10, 10)
+        ambient_temp = _AMBIENT_BASE_BY_HOUR[hour] + ambient_temp_noise
+        humidity = 50 + 20 * humidity_wave + humidity_noise
         
         # Load demand simulation (higher during day)
-        load_base = 80 + 40 * (0.5 + 0.5 * math.sin((hour - 6) * math.pi / 12))
-        load_demand = max(50, load_base + random.uniform(-20, 20))
-        
-        readings = {
-            # Solar readings
-            'solar_voltage': round(solar_voltage, 2),
-            'solar_current': round(solar_current, 2),
-            'solar_power': round(solar_voltage * solar_current, 2),
-            'solar_irradiance': round(solar_irradiance, 1),
-            
-            # Thermal readings
-            'thermal_voltage': round(thermal_voltage, 2),
-            'thermal_current': round(thermal_current, 2),
-            'thermal_temperature': round(thermal_temp, 1),
-            
-            # Battery readings
-            'battery_voltage': round(battery_voltage, 2),
-            'battery_current': round(battery_current, 2),
-            'battery_soc': round(battery_soc, 1),
-            'battery_level': round(battery_soc, 1),  # Alias for compatibility
-            'battery_temperature': round(battery_temp, 1),
-            
-            # Environmental readings
-            'ambient_temperature': round(ambient_temp, 1),
-            'temperature': round(ambient_temp, 1),  # Alias for compatibility
-            'humidity': round(max(30, min(90, humidity)), 1),
-            
-            # System readings
-            'hour_of_day': hour,
-            'time_of_day': hour,  # Alias for compatibility
-            'day_of_year': day,
-            'load_demand': round(load_demand, 1),
-            'power_demand': round(load_demand, 1),  # Alias for compatibility
-            'wind_speed': round(random.uniform(0, 15), 1),
-            
-            # Metadata
-            'timestamp': datetime.now().isoformat(),
-            'simulation_mode': True
-        }
+        load_demand = max(50, _LOAD_BASE_BY_HOUR[hour] + load_noise)
+        
+        # Round every output in bulk
+        values = self._sim_buf
+        values[:] = (solar_voltage, solar_current, solar_voltage * solar_current, solar_irradiance,
+                     thermal_voltage, thermal_current, thermal_temp,
+                     battery_voltage, battery_current, battery_soc, battery_temp,
+                     ambient_temp, max(30, min(90, humidity)), load_demand, wind_speed)
+        np.multiply(values, self._round_scales, out=values)
+        np.rint(values, out=values)
+        np.divide(values, self._round_scales, out=values)
+        (solar_voltage, solar_current, solar_power, solar_irradiance,
+         thermal_voltage, thermal_current, thermal_temp,
+         battery_voltage, battery_current, battery_soc, battery_temp,
+         ambient_temp, humidity, load_demand, wind_speed) = values.tolist()
+        
+        # Solar readings
+        readings['solar_voltage'] = solar_voltage
+        readings['solar_current'] = solar_current
+        readings['solar_power'] = solar_power
+        readings['solar_irradiance'] = solar_irradiance
+        
+        # Thermal readings
+        readings['thermal_voltage'] = thermal_voltage
+        readings['thermal_current'] = thermal_current
+        readings['thermal_temperature'] = thermal_temp
         
-        return readings
+        # Battery readings
+        readings['battery_voltage'] = battery_voltage
+        readings['battery_current'] = battery_current
+        readings['battery_soc'] = battery_soc
+        readings['battery_temperature'] = battery_temp
+        
+        # Environmental readings
+        readings['ambient_temperature'] = ambient_temp
+        readings['humidity'] = humidity
+        
+        # System readings
+        readings['hour_of_day'] = hour
+        readings['day_of_year'] = day
+        readings['load_demand'] = load_demand
+        readings['wind_speed'] = wind_speed
+        
+        # Metadata
+        readings['ts_unix'] = ts_unix
+        readings['simulation_mode'] = True
     
     def _read_current_sensor(self, sensor_type):
         """Read current sensor for specified type."""
         # Placeholder for actual current sensor reading
         # This would use ACS712 or similar current sensors
-        return random.uniform(0.5, 3.0)
+        return self._hw_noise[_CURRENT_NOISE_INDEX[sensor_type]]
     
     def _read_thermal_temperature(self):
         """Read thermal sensor temperature."""
         # Placeholder for thermistor or thermocouple reading
-        return random.uniform(40, 80)
+        return self._hw_noise[3]
     
     def _read_battery_temperature(self):
         """Read battery temperature sensor."""
         # Placeholder for battery temperature sensor
-        return random.uniform(20, 35)
+        return self._hw_noise[4]
     
     def _read_ambient_temperature(self):
         """Read ambient temperature sensor."""
         # Placeholder for DHT22 or similar sensor
-        return random.uniform(15, 35)
+        return self._hw_noise[5]
     
     def _read_humidity(self):
         """Read humidity sensor."""
         # Placeholder for DHT22 humidity reading
-        return random.uniform(40, 80)
+        return self._hw_noise[6]
     
     def _calculate_battery_soc(self, voltage):
         """Calculate battery State of Charge from voltage."""
@@ -293,20 +533,18 @@ class SensorManager:
         soc = ((voltage - min_voltage) / (max_voltage - min_voltage)) * 100
         return max(0, min(100, soc))
     
-    def _calculate_load_demand(self):
-        """Calculate current load demand."""
+    def _calculate_load_demand(self, hour):
+        """Calculate current load demand for the given hour of day."""
         # Placeholder - would measure actual load current
-        hour = datetime.now().hour
-        base_load = 80 + 40 * (0.5 + 0.5 * math.sin((hour - 6) * math.pi / 12))
-        return base_load + random.uniform(-10, 10)
+        return _LOAD_BASE_BY_HOUR[hour] + self._hw_noise[7]
     
     def get_all_readings(self):
-        """Get the latest sensor readings."""
-        if not self.latest_readings:
+        """Get the latest sensor readings (an immutable SensorReading, safe to share)."""
+        if self.latest_readings is None:
             # If no readings yet, get them immediately
             self.latest_readings = self.read_all_sensors()
         
-        return self.latest_readings.copy()
+        return self.latest_readings
     
     def get_sensor_status(self):
         """Get status of all sensors."""
@@ -315,11 +553,11 @@ class SensorManager:
         status = {
             'hardware_available': self.hardware_available,
             'monitoring': self.monitoring,
-            'last_reading': readings.get('timestamp'),
+            'last_reading': readings.timestamp,
             'sensor_health': {
-                'solar': 'ok' if readings.get('solar_voltage', 0) > 0 else 'error',
-                'thermal': 'ok' if readings.get('thermal_voltage', 0) >= 0 else 'error',
-                'battery': 'ok' if readings.get('battery_voltage', 0) > 10 else 'low',
+                'solar': 'ok' if readings.solar_voltage > 0 else 'error',
+                'thermal': 'ok' if readings.thermal_voltage >= 0 else 'error',
+                'battery': 'ok' if readings.battery_voltage > 10 else 'low',
                 'environmental': 'ok'
             }
         }
@@ -335,8 +573,14 @@ class SensorManager:
         """Clean up resources."""
         self.stop_monitoring()
         
+        self._adc_stop.set()
+        if self._adc_thread:
+            self._adc_thread.join(timeout=2)
+        
         if self.hardware_available:
             try:
-                GPIO.cleanup()
+                GPIO = sys.modules.get('RPi.GPIO')
+                if GPIO is not None:
+                    GPIO.cleanup()
             except:
                 pass
@@ -13,31 +13,147 @@ Date: August 2025
 
 import sys
 import time
+import atexit
+import queue
 import logging
+import threading
+from collections import OrderedDict
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from operator import attrgetter
 from pathlib import Path
 
-# Add src to path for imports
-sys.path.append(str(Path(__file__).parent))
+import numpy as np
 
-from ai_models.energy_optimizer import EnergyOptimizer
-from hardware.sensor_manager import SensorManager
-from hardware.power_controller import PowerController
-from web.dashboard import create_app
-from utils.config_loader import ConfigLoader
-from utils.data_logger import DataLogger
+from .ai_models.energy_optimizer import EnergyOptimizer, decision_key
+from .hardware.sensor_manager import SensorManager
+from .hardware.power_controller import PowerController
+from .utils.config_loader import ConfigLoader
+from .utils.data_logger import DataLogger
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('logs/system.log'),
+# The web dashboard module is optional; without it the system runs headless
+try:
+    from .web.dashboard import create_app
+    DASHBOARD_AVAILABLE = True
+except ImportError:
+    DASHBOARD_AVAILABLE = False
+
+# Optional JIT compilation of the per-tick safety kernel
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    
+    def njit(*args, **kwargs):
+        """Fallback decorator that leaves the function as plain Python."""
+        def decorator(func):
+            return func
+        return decorator
+
+# Production WSGI server for the dashboard; falls back to Flask's dev server
+try:
+    from waitress import serve
+    WAITRESS_AVAILABLE = True
+except ImportError:
+    WAITRESS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Listener thread doing the log I/O, once setup_logging() has run
+_log_listener = None
+
+def setup_logging():
+    """Configure logging: callers only enqueue records, a listener thread does the I/O."""
+    global _log_listener
+    root = logging.getLogger()
+    if root.handlers:
+        # Already configured by the embedding application (or an earlier call)
+        return
+    
+    Path('logs').mkdir(exist_ok=True)
+    handlers = (
+        RotatingFileHandler('logs/system.log', maxBytes=10_000_000, backupCount=5),
         logging.StreamHandler(sys.stdout)
-    ]
+    )
+    for handler in handlers:
+        handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+    
+    log_queue = queue.Queue(-1)
+    root.setLevel(logging.INFO)
+    root.addHandler(QueueHandler(log_queue))
+    _log_listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _log_listener.start()
+    atexit.register(stop_logging)
+
+def stop_logging():
+    """Drain queued log records and log directly from then on; safe to call more than once."""
+    global _log_listener
+    listener, _log_listener = _log_listener, None
+    if listener is None:
+        return
+    
+    listener.stop()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        if isinstance(handler, QueueHandler) and handler.queue is listener.queue:
+            root.removeHandler(handler)
+    for handler in listener.handlers:
+        root.addHandler(handler)
+
+# Predictions kept, keyed on the optimizer's decision_key for the readings
+PREDICTION_CACHE_SIZE = 256
+
+# Quantization steps for detecting a steady system: ticks whose readings agree
+# at this resolution with the last logged tick are not logged again
+STATE_QUANTA = (
+    ('solar_irradiance', 10.0),    # W/m^2
+    ('ambient_temperature', 0.5),  # deg C
+    ('battery_soc', 1.0),          # %
+    ('load_demand', 5.0),          # W
+    ('wind_speed', 0.5),           # m/s
+    ('hour_of_day', 1),
+    ('solar_voltage', 0.1),        # V
+    ('thermal_voltage', 0.1),      # V
+    ('battery_voltage', 0.1),      # V
+    ('thermal_temperature', 0.5),  # deg C
+    ('battery_temperature', 0.5)   # deg C
 )
 
-logger = logging.getLogger(__name__)
+def _quantize(sensor_data, quanta):
+    """Readings rounded to the given (field, step) resolution, as a hashable tuple."""
+    return tuple(None if value is None else round(value / step)
+                 for value, step in ((sensor_data.get(name), step) for name, step in quanta))
+
+# Reading fields packed, in this order, into the safety kernel's input array
+SAFETY_FIELDS = ('solar_voltage', 'solar_current', 'thermal_voltage',
+                 'thermal_temperature', 'battery_voltage', 'battery_temperature')
+_read_safety_fields = attrgetter(*SAFETY_FIELDS)
+
+# Bits of the safety mask, one per source that is currently safe to use
+SAFE_SOLAR = 1
+SAFE_THERMAL = 2
+SAFE_BATTERY = 4
+SAFETY_BITS = {'solar': SAFE_SOLAR, 'thermal': SAFE_THERMAL, 'battery': SAFE_BATTERY}
+
+@njit(cache=True)
+def _safety_mask(values, thresholds):
+    """
+    Safety of every source in one pass, as a SAFE_* bitmask.
+    thresholds: solar min V, solar min A, thermal min V, thermal min/max temp,
+    battery min V, battery max temp.
+    """
+    mask = 0
+    if values[0] >= thresholds[0] and values[1] >= thresholds[1]:
+        mask |= 1
+    if values[2] >= thresholds[2] and thresholds[3] <= values[3] <= thresholds[4]:
+        mask |= 2
+    if values[4] >= thresholds[5] and values[5] <= thresholds[6]:
+        mask |= 4
+    return mask
+
+# Seconds a built status snapshot is reused for dashboard requests
+STATUS_CACHE_TTL = 0.5
 
 class DualEnergySystem:
     """Main system controller for dual energy source management."""
@@ -48,6 +164,7 @@ class DualEnergySystem:
         
         # Load configuration
         self.config = ConfigLoader('config/system_config.yaml')
+        self._cache_thresholds()
         
         # Initialize components
         self.sensor_manager = SensorManager(self.config)
@@ -57,26 +174,74 @@ class DualEnergySystem:
         
         # System state
         self.running = False
+        self._stop = threading.Event()
+        
+        # Guards current_source together with the relay switch that changes it; taken
+        # before the power controller's own lock by the control loop and the button callback
+        self._source_lock = threading.RLock()
+        self.power_controller.emergency_callback = self._on_emergency_button
+        
+        # (source, optimal source, quantized readings, monotonic time) of the last logged tick
+        self._last_logged = None
         self.current_source = "battery"  # Default to battery
         
+        # LRU cache of optimizer predictions keyed on quantized readings
+        self._pred_cache = OrderedDict()
+        self._pred_cache_hits = 0
+        self._pred_cache_lookups = 0
+        
+        # Compile the safety kernel up front rather than on the first control tick
+        _safety_mask(np.zeros(len(SAFETY_FIELDS)), self._safety_thresholds)
+        
+        # Last status snapshot (monotonic build time, status), shared by web worker threads
+        self._status_cache = (0.0, None)
+        self._status_lock = threading.Lock()
+        
+    def _cache_thresholds(self):
+        """Snapshot the static safety thresholds and loop timing from the config."""
+        config = self.config
+        self._solar_min_voltage = float(config.get('solar_min_voltage', 12.0))
+        self._solar_min_current = float(config.get('solar_min_current', 0.5))
+        self._thermal_min_v = float(config.get('thermal_min_voltage', 5.0))
+        self._thermal_max_t = float(config.get('thermal_max_temperature', 85.0))
+        self._thermal_min_t = float(config.get('thermal_min_temperature', 40.0))
+        self._battery_min_v = float(config.get('battery_min_voltage', 10.5))
+        self._battery_max_t = float(config.get('battery_max_temperature', 45.0))
+        self._battery_crit_v = float(config.get('battery_critical_voltage', 10.0))
+        self._battery_crit_t = float(config.get('battery_critical_temp', 50.0))
+        self._thermal_crit_t = float(config.get('thermal_critical_temp', 90.0))
+        self._loop_interval = float(config.get('control_loop_interval', 5))
+        self._log_heartbeat = float(config.get('logging.log_interval', 60))
+        
+        # Safety kernel thresholds, in the order _safety_mask expects
+        self._safety_thresholds = np.array([
+            self._solar_min_voltage, self._solar_min_current,
+            self._thermal_min_v, self._thermal_min_t, self._thermal_max_t,
+            self._battery_min_v, self._battery_max_t
+        ])
+        
+        # Emergency limits as (reading field, threshold) pairs, checked in this order
+        self._low_limits = (('battery_voltage', self._battery_crit_v),)
+        self._high_limits = (('battery_temperature', self._battery_crit_t),
+                             ('thermal_temperature', self._thermal_crit_t))
+    
     def start_system(self):
         """Start the energy management system."""
         logger.info("Starting energy management system")
         self.running = True
+        self._stop.clear()
         
         try:
             # Start sensor monitoring
             self.sensor_manager.start_monitoring()
             
             # Start web dashboard in separate thread
-            app = create_app(self)
-            from threading import Thread
-            web_thread = Thread(target=lambda: app.run(host='0.0.0.0', port=5000, debug=False))
-            web_thread.daemon = True
-            web_thread.start()
+            if DASHBOARD_AVAILABLE:
+                self.start_dashboard()
+            else:
+                logger.warning("Web dashboard module not available - running without dashboard")
             
             logger.info("System started successfully")
-            logger.info("Web dashboard available at http://localhost:5000")
             
             # Main control loop
             self.control_loop()
@@ -88,42 +253,101 @@ class DualEnergySystem:
             logger.error(f"System error: {e}")
             self.shutdown()
     
+    def start_dashboard(self):
+        """Serve the web dashboard from a daemon thread."""
+        app = create_app(self)
+        host = self.config.get('web.host', '0.0.0.0')
+        port = self.config.get('web.port', 5000)
+        if WAITRESS_AVAILABLE:
+            threads = self.config.get('web.threads', 8)
+            target = lambda: serve(app, host=host, port=port, threads=threads)
+        else:
+            logger.warning("waitress not installed - serving the dashboard with Flask's dev server")
+            target = lambda: app.run(host=host, port=port, debug=False)
+        web_thread = threading.Thread(target=target, daemon=True)
+        web_thread.start()
+        
+        logger.info(f"Web dashboard available at http://localhost:{port}")
+    
     def control_loop(self):
         """Main control loop for energy optimization."""
         logger.info("Starting main control loop")
         
-        while self.running:
+        # Ticks are scheduled on a monotonic deadline so the cadence ignores per-tick work time
+        deadline = time.monotonic()
+        while not self._stop.is_set():
+            # One wall-clock read per tick, shared by everything recorded for it
+            tick_time = time.time()
             try:
                 # Get current sensor readings
                 sensor_data = self.sensor_manager.get_all_readings()
                 
                 # Use AI model to determine optimal energy source
-                optimal_source = self.energy_optimizer.predict_optimal_source(sensor_data)
+                optimal_source = self.predict_source(sensor_data)
                 
                 # Switch energy source if needed
                 if optimal_source != self.current_source:
                     self.switch_energy_source(optimal_source, sensor_data)
                 
-                # Log data
-                self.data_logger.log_system_state({
-                    'timestamp': datetime.now(),
-                    'current_source': self.current_source,
-                    'sensor_data': sensor_data,
-                    'optimal_source': optimal_source
-                })
-                
-                # Update AI model with recent performance data
-                self.energy_optimizer.update_model(sensor_data, self.current_source)
+                # Log data and update the model, unless nothing changed since the last
+                # logged tick and the heartbeat interval has not yet elapsed
+                if self._state_changed(sensor_data, optimal_source):
+                    self.data_logger.log_system_state({
+                        'timestamp': tick_time,
+                        'current_source': self.current_source,
+                        'sensor_data': sensor_data,
+                        'optimal_source': optimal_source
+                    })
+                    
+                    # Update AI model with recent performance data
+                    self.energy_optimizer.update_model(sensor_data, self.current_source)
                 
                 # Monitor system health
                 self.check_system_health(sensor_data)
                 
-                # Wait before next iteration
-                time.sleep(self.config.get('control_loop_interval', 5))
-                
             except Exception as e:
                 logger.error(f"Error in control loop: {e}")
-                time.sleep(1)
+            
+            # Wait for the next tick; returns early once shutdown is requested
+            now = time.monotonic()
+            deadline = max(deadline + self._loop_interval, now)
+            self._stop.wait(deadline - now)
+    
+    def _state_changed(self, sensor_data, optimal_source):
+        """Whether this tick differs from the last logged one (recording it if so)."""
+        now = time.monotonic()
+        state = (self.current_source, optimal_source, _quantize(sensor_data, STATE_QUANTA))
+        last = self._last_logged
+        if last is not None and last[:3] == state and now - last[3] < self._log_heartbeat:
+            return False
+        
+        self._last_logged = state + (now,)
+        return True
+    
+    def predict_source(self, sensor_data):
+        """Optimal source for the readings, reusing the prediction for readings in the same decision tiers."""
+        key = decision_key(self.energy_optimizer.standardize_sensor_data(sensor_data))
+        
+        cache = self._pred_cache
+        self._pred_cache_lookups += 1
+        source = cache.get(key)
+        if source is not None:
+            cache.move_to_end(key)
+            self._pred_cache_hits += 1
+            return source
+        
+        source = self.energy_optimizer.predict_optimal_source(sensor_data)
+        cache[key] = source
+        if len(cache) > PREDICTION_CACHE_SIZE:
+            cache.popitem(last=False)
+        return source
+    
+    @property
+    def prediction_cache_hit_rate(self):
+        """Fraction of predictions served from the cache."""
+        if not self._pred_cache_lookups:
+            return 0.0
+        return self._pred_cache_hits / self._pred_cache_lookups
     
     def switch_energy_source(self, new_source, sensor_data):
         """Switch to a new energy source."""
@@ -131,73 +355,51 @@ class DualEnergySystem:
         
         # Safety checks before switching
         if self.is_safe_to_switch(new_source, sensor_data):
-            success = self.power_controller.switch_source(self.current_source, new_source)
-            
-            if success:
-                self.current_source = new_source
-                logger.info(f"Successfully switched to {new_source}")
-            else:
-                logger.warning(f"Failed to switch to {new_source}, staying on {self.current_source}")
+            with self._source_lock:
+                success = self.power_controller.switch_source(self.current_source, new_source)
+                
+                if success:
+                    self.current_source = new_source
+                    logger.info(f"Successfully switched to {new_source}")
+                else:
+                    logger.warning(f"Failed to switch to {new_source}, staying on {self.current_source}")
         else:
             logger.warning(f"Safety check failed, cannot switch to {new_source}")
     
     def is_safe_to_switch(self, new_source, sensor_data):
         """Check if it's safe to switch to a new energy source."""
-        safety_checks = {
-            'solar': self.check_solar_safety,
-            'thermal': self.check_thermal_safety,
-            'battery': self.check_battery_safety
-        }
-        
-        return safety_checks.get(new_source, lambda x: False)(sensor_data)
+        bit = SAFETY_BITS.get(new_source)
+        return bit is not None and bool(self.safety_mask(sensor_data) & bit)
+    
+    def safety_mask(self, sensor_data):
+        """SAFE_* bitmask of the sources that are safe to use with these readings."""
+        # Local array per call: the control loop and web threads call this concurrently
+        values = np.array(_read_safety_fields(sensor_data), dtype=np.float64)
+        return _safety_mask(values, self._safety_thresholds)
     
     def check_solar_safety(self, sensor_data):
         """Check if solar power is safe to use."""
-        solar_voltage = sensor_data.get('solar_voltage', 0)
-        solar_current = sensor_data.get('solar_current', 0)
-        
-        min_voltage = self.config.get('solar_min_voltage', 12.0)
-        min_current = self.config.get('solar_min_current', 0.5)
-        
-        return solar_voltage >= min_voltage and solar_current >= min_current
+        return bool(self.safety_mask(sensor_data) & SAFE_SOLAR)
     
     def check_thermal_safety(self, sensor_data):
         """Check if thermal energy is safe to use."""
-        thermal_voltage = sensor_data.get('thermal_voltage', 0)
-        thermal_temp = sensor_data.get('thermal_temperature', 0)
-        
-        min_voltage = self.config.get('thermal_min_voltage', 5.0)
-        max_temp = self.config.get('thermal_max_temperature', 85.0)
-        min_temp = self.config.get('thermal_min_temperature', 40.0)
-        
-        return (thermal_voltage >= min_voltage and 
-                min_temp <= thermal_temp <= max_temp)
+        return bool(self.safety_mask(sensor_data) & SAFE_THERMAL)
     
     def check_battery_safety(self, sensor_data):
         """Check if battery is safe to use."""
-        battery_voltage = sensor_data.get('battery_voltage', 0)
-        battery_temp = sensor_data.get('battery_temperature', 0)
-        
-        min_voltage = self.config.get('battery_min_voltage', 10.5)
-        max_temp = self.config.get('battery_max_temperature', 45.0)
-        
-        return (battery_voltage >= min_voltage and battery_temp <= max_temp)
+        return bool(self.safety_mask(sensor_data) & SAFE_BATTERY)
     
     def check_system_health(self, sensor_data):
         """Monitor system health and handle emergencies."""
         # Check for emergency conditions
-        emergency_conditions = [
-            ('battery_voltage', 'low', self.config.get('battery_critical_voltage', 10.0)),
-            ('battery_temperature', 'high', self.config.get('battery_critical_temp', 50.0)),
-            ('thermal_temperature', 'high', self.config.get('thermal_critical_temp', 90.0))
-        ]
-        
-        for param, condition, threshold in emergency_conditions:
-            value = sensor_data.get(param, 0)
-            
-            if condition == 'low' and value <= threshold:
+        for param, threshold in self._low_limits:
+            value = getattr(sensor_data, param)
+            if value <= threshold:
                 self.handle_emergency(f"Critical low {param}: {value}")
-            elif condition == 'high' and value >= threshold:
+        
+        for param, threshold in self._high_limits:
+            value = getattr(sensor_data, param)
+            if value >= threshold:
                 self.handle_emergency(f"Critical high {param}: {value}")
     
     def handle_emergency(self, message):
@@ -206,49 +408,62 @@ class DualEnergySystem:
         
         # Switch to safest available source (usually battery)
         safe_source = self.find_safest_source()
-        if safe_source and safe_source != self.current_source:
-            self.power_controller.emergency_switch(safe_source)
-            self.current_source = safe_source
+        with self._source_lock:
+            if safe_source and safe_source != self.current_source:
+                self.power_controller.emergency_switch(safe_source)
+                self.current_source = safe_source
         
         # Log emergency
         self.data_logger.log_emergency(message)
     
+    def _on_emergency_button(self):
+        """Emergency stop button handler, called from the GPIO callback thread."""
+        self.handle_emergency("Emergency stop button pressed")
+    
     def find_safest_source(self):
         """Find the safest available energy source."""
         sensor_data = self.sensor_manager.get_all_readings()
         
+        mask = self.safety_mask(sensor_data)
+        
         # Priority order: battery > solar > thermal
-        if self.check_battery_safety(sensor_data):
+        if mask & SAFE_BATTERY:
             return 'battery'
-        elif self.check_solar_safety(sensor_data):
+        elif mask & SAFE_SOLAR:
             return 'solar'
-        elif self.check_thermal_safety(sensor_data):
+        elif mask & SAFE_THERMAL:
             return 'thermal'
         
         return None
     
     def get_system_status(self):
-        """Get current system status for web interface."""
-        sensor_data = self.sensor_manager.get_all_readings()
-        
-        return {
-            'current_source': self.current_source,
-            'sensor_data': sensor_data,
-            'system_health': self.get_health_status(sensor_data),
-            'timestamp': datetime.now().isoformat()
-        }
+        """Get current system status for web interface, reusing a snapshot built within STATUS_CACHE_TTL."""
+        # Only one request thread rebuilds an expired snapshot; the others wait and reuse it
+        with self._status_lock:
+            now = time.monotonic()
+            built, status = self._status_cache
+            if status is not None and now - built < STATUS_CACHE_TTL:
+                return status
+            
+            sensor_data = self.sensor_manager.get_all_readings()
+            
+            status = {
+                'current_source': self.current_source,
+                'sensor_data': sensor_data.as_dict(),
+                'system_health': self.get_health_status(sensor_data),
+                'prediction_cache_hit_rate': self.prediction_cache_hit_rate,
+                'timestamp': datetime.now().isoformat()
+            }
+            self._status_cache = (now, status)
+            return status
     
     def get_health_status(self, sensor_data):
         """Get overall system health status."""
-        health_checks = [
-            self.check_solar_safety(sensor_data),
-            self.check_thermal_safety(sensor_data),
-            self.check_battery_safety(sensor_data)
-        ]
+        mask = self.safety_mask(sensor_data)
         
-        if all(health_checks):
+        if mask == SAFE_SOLAR | SAFE_THERMAL | SAFE_BATTERY:
             return 'excellent'
-        elif any(health_checks):
+        elif mask:
             return 'good'
         else:
             return 'critical'
@@ -257,12 +472,15 @@ class DualEnergySystem:
         """Gracefully shutdown the system."""
         logger.info("Shutting down system")
         self.running = False
+        self._stop.set()
         
         # Stop monitoring
         self.sensor_manager.stop_monitoring()
         
         # Switch to battery for safety
-        self.power_controller.switch_source(self.current_source, 'battery')
+        with self._source_lock:
+            if self.power_controller.switch_source(self.current_source, 'battery'):
+                self.current_source = 'battery'
         
         # Close data logger
         self.data_logger.close()
@@ -276,10 +494,9 @@ def main():
     print("AI-Powered Energy Optimization")
     print("=" * 60)
     
+    setup_logging()
+    
     try:
-        # Create logs directory
-        Path('logs').mkdir(exist_ok=True)
-        
         # Initialize and start system
         system = DualEnergySystem()
         system.start_system()
@@ -8,6 +8,7 @@ Loads and manages system configuration from YAML files.
 import yaml
 import os
 import logging
+from functools import lru_cache
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +19,9 @@ class ConfigLoader:
         """Initialize configuration loader."""
         self.config_path = config_path
         self.config = {}
+        
+        # Memoized key lookups; cleared whenever the configuration changes
+        self._cached_get = lru_cache(maxsize=256)(self._resolve)
         self.load_config()
     
     def load_config(self):
@@ -33,6 +37,7 @@ class ConfigLoader:
         except Exception as e:
             logger.error(f"Error loading config: {e}")
             self.config = self.get_default_config()
+        self._cached_get.cache_clear()
     
     def get_default_config(self):
         """Return default configuration."""
@@ -56,6 +61,14 @@ class ConfigLoader:
     
     def get(self, key, default=None):
         """Get configuration value with optional default."""
+        try:
+            return self._cached_get(key, default)
+        except TypeError:
+            # Unhashable default, resolve without the cache
+            return self._resolve(key, default)
+    
+    def _resolve(self, key, default):
+        """Walk the dotted key path through the configuration."""
         keys = key.split('.')
         value = self.config
         
@@ -78,6 +91,7 @@ class ConfigLoader:
             config = config[k]
         
         config[keys[-1]] = value
+        self._cached_get.cache_clear()
     
     def save_config(self):
         """Save current configuration to file."""
@@ -8,11 +8,74 @@ Logs system data to SQLite database for analysis and monitoring.
 import sqlite3
 import json
 import logging
-from datetime import datetime
+import threading
+import queue
+import time
+from datetime import datetime, timedelta
 import os
+from collections import Counter
+
+# Optional C JSON encoder for the logging hot path
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+# Tables that may be named in queries; anything else is rejected
+TABLES = ('system_state', 'emergency_events', 'performance_metrics')
+
+# Insert statements, kept as constant strings so sqlite3's statement cache hits on every call
+INSERT_SYSTEM_STATE_SQL = (
+    'INSERT INTO system_state '
+    '(timestamp, current_source, sensor_data, optimal_source, confidence, system_health) '
+    'VALUES (?, ?, ?, ?, ?, ?)'
+)
+INSERT_EMERGENCY_SQL = (
+    'INSERT INTO emergency_events '
+    '(timestamp, event_type, description, sensor_data, action_taken) '
+    'VALUES (?, ?, ?, ?, ?)'
+)
+INSERT_METRIC_SQL = (
+    'INSERT INTO performance_metrics '
+    '(timestamp, metric_name, metric_value, unit) '
+    'VALUES (?, ?, ?, ?)'
+)
+
+# Per-hour source counts, maintained alongside system_state for the statistics view
+ROLLUP_PERIOD = 3600
+UPSERT_ROLLUP_SQL = (
+    'INSERT INTO hourly_rollup (hour_ts, source, cnt) VALUES (?, ?, ?) '
+    'ON CONFLICT(hour_ts, source) DO UPDATE SET cnt = cnt + excluded.cnt'
+)
+
+if ORJSON_AVAILABLE:
+    def _dumps(obj):
+        """Encode to a JSON string; readings go through their mapping view like json's default=dict."""
+        return orjson.dumps(obj, default=dict, option=orjson.OPT_PASSTHROUGH_DATACLASS).decode()
+else:
+    def _dumps(obj):
+        """Encode to a JSON string."""
+        return json.dumps(obj, default=dict)
+
+def _pack_state(state_data):
+    """Parameter tuple for INSERT_SYSTEM_STATE_SQL."""
+    get = state_data.get
+    return (
+        int(state_data['timestamp']),
+        state_data['current_source'],
+        _dumps(state_data['sensor_data']),
+        get('optimal_source'),
+        get('confidence'),
+        get('system_health', 'unknown')
+    )
+
+def _cutoff(**window):
+    """Unix time (seconds) marking the start of a window ending now."""
+    return int(time.time() - timedelta(**window).total_seconds())
+
 class DataLogger:
     """Manages data logging to SQLite database."""
     
@@ -25,20 +88,43 @@ class DataLogger:
         # Ensure data directory exists
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
         
+        # One connection shared by every caller thread, serialized by the lock
+        self.conn = None
+        self._insert = None
+        self._lock = threading.Lock()
+        
         # Initialize database
         self.init_database()
+        
+        # System state rows are queued and written in batches by a background flusher
+        self.flush_interval = config.get('logging.flush_interval', 5)
+        self.flush_batch = config.get('logging.flush_batch', 100)
+        self._pending = queue.Queue()
+        self._flush_event = threading.Event()
+        self._closing = False
+        self._flush_thread = threading.Thread(target=self._flusher, daemon=True)
+        self._flush_thread.start()
     
     def init_database(self):
-        """Initialize SQLite database with required tables."""
+        """Open the persistent connection and create the required tables."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            self.conn = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
+            self._insert = self.conn.execute
+            cursor = self.conn.cursor()
+            
+            # WAL groups commits into the log instead of an fsync per insert
+            cursor.execute('PRAGMA journal_mode=WAL')
+            cursor.execute('PRAGMA synchronous=NORMAL')
+            cursor.execute('PRAGMA temp_store=MEMORY')
+            
+            cursor.execute('BEGIN')
+            legacy_tables = self._detach_text_timestamp_tables(cursor)
             
             # System state table
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS system_state (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    timestamp TEXT NOT NULL,
+                    timestamp INTEGER NOT NULL,
                     current_source TEXT NOT NULL,
                     sensor_data TEXT NOT NULL,
                     optimal_source TEXT,
@@ -51,7 +137,7 @@ class DataLogger:
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS emergency_events (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    timestamp TEXT NOT NULL,
+                    timestamp INTEGER NOT NULL,
                     event_type TEXT NOT NULL,
                     description TEXT NOT NULL,
                     sensor_data TEXT,
@@ -63,66 +149,124 @@ class DataLogger:
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS performance_metrics (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    timestamp TEXT NOT NULL,
+                    timestamp INTEGER NOT NULL,
                     metric_name TEXT NOT NULL,
                     metric_value REAL NOT NULL,
                     unit TEXT
                 )
             ''')
             
-            conn.commit()
-            conn.close()
+            # Hourly source counts backing get_system_statistics
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS hourly_rollup (
+                    hour_ts INTEGER NOT NULL,
+                    source TEXT NOT NULL,
+                    cnt INTEGER NOT NULL,
+                    PRIMARY KEY (hour_ts, source)
+                ) WITHOUT ROWID
+            ''')
+            
+            for table in legacy_tables:
+                self._copy_text_timestamp_rows(cursor, table)
+            
+            # Seed the rollup from rows logged before it existed
+            if cursor.execute('SELECT 1 FROM hourly_rollup LIMIT 1').fetchone() is None:
+                cursor.execute(f'''
+                    INSERT INTO hourly_rollup (hour_ts, source, cnt)
+                    SELECT timestamp / {ROLLUP_PERIOD} * {ROLLUP_PERIOD}, current_source, COUNT(*)
+                    FROM system_state GROUP BY 1, 2
+                ''')
+            
+            # Time-range scans seek on the timestamp instead of scanning the table
+            for table in TABLES:
+                cursor.execute(f'CREATE INDEX IF NOT EXISTS ix_{table}_ts ON {table}(timestamp)')
+            
+            cursor.execute('COMMIT')
             logger.info("Database initialized successfully")
             
         except Exception as e:
             logger.error(f"Error initializing database: {e}")
+            if self.conn is not None and self.conn.in_transaction:
+                self.conn.execute('ROLLBACK')
+    
+    def _detach_text_timestamp_tables(self, cursor):
+        """Rename tables from the old ISO-text timestamp schema out of the way; returns their names."""
+        legacy_tables = []
+        for table in TABLES:
+            columns = cursor.execute(f'PRAGMA table_info({table})').fetchall()
+            if any(name == 'timestamp' and col_type.upper() == 'TEXT'
+                   for _, name, col_type, *_ in columns):
+                logger.info(f"Migrating {table} to integer timestamps")
+                cursor.execute(f'DROP INDEX IF EXISTS ix_{table}_ts')
+                cursor.execute(f'ALTER TABLE {table} RENAME TO {table}_text_ts')
+                legacy_tables.append(table)
+        return legacy_tables
+    
+    def _copy_text_timestamp_rows(self, cursor, table):
+        """Copy rows from a renamed legacy table into the new one, converting local ISO times to Unix seconds."""
+        columns = [row[1] for row in cursor.execute(f'PRAGMA table_info({table}_text_ts)')]
+        select = ", ".join(
+            "COALESCE(CAST(strftime('%s', timestamp, 'utc') AS INTEGER), 0)" if name == 'timestamp' else name
+            for name in columns
+        )
+        cursor.execute(f'INSERT INTO {table} ({", ".join(columns)}) SELECT {select} FROM {table}_text_ts')
+        cursor.execute(f'DROP TABLE {table}_text_ts')
     
     def log_system_state(self, state_data):
-        """Log current system state."""
+        """Log current system state (`timestamp` in Unix seconds)."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                INSERT INTO system_state 
-                (timestamp, current_source, sensor_data, optimal_source, confidence, system_health)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (
-                state_data['timestamp'].isoformat() if hasattr(state_data['timestamp'], 'isoformat') 
-                else str(state_data['timestamp']),
-                state_data['current_source'],
-                json.dumps(state_data['sensor_data']),
-                state_data.get('optimal_source'),
-                state_data.get('confidence'),
-                state_data.get('system_health', 'unknown')
-            ))
-            
-            conn.commit()
-            conn.close()
+            self._pending.put(_pack_state(state_data))
+            if self._pending.qsize() >= self.flush_batch:
+                self._flush_event.set()
             
         except Exception as e:
             logger.error(f"Error logging system state: {e}")
     
+    def _flusher(self):
+        """Background loop writing queued system state rows every flush interval."""
+        while not self._closing:
+            self._flush_event.wait(self.flush_interval)
+            self._flush_event.clear()
+            self.flush()
+    
+    def flush(self):
+        """Write every queued system state row in a single transaction."""
+        with self._lock:
+            rows = []
+            while True:
+                try:
+                    rows.append(self._pending.get_nowait())
+                except queue.Empty:
+                    break
+            
+            if not rows or self.conn is None:
+                return
+            
+            try:
+                self.conn.execute('BEGIN')
+                self.conn.executemany(INSERT_SYSTEM_STATE_SQL, rows)
+                hourly = Counter((ts - ts % ROLLUP_PERIOD, source) for ts, source, *_ in rows)
+                self.conn.executemany(UPSERT_ROLLUP_SQL, [key + (cnt,) for key, cnt in hourly.items()])
+                self.conn.execute('COMMIT')
+            except Exception as e:
+                logger.error(f"Error flushing {len(rows)} system state rows: {e}")
+                if self.conn.in_transaction:
+                    self.conn.execute('ROLLBACK')
+    
     def log_emergency(self, event_description, sensor_data=None, action_taken=None):
         """Log emergency event."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                INSERT INTO emergency_events 
-                (timestamp, event_type, description, sensor_data, action_taken)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (
-                datetime.now().isoformat(),
+            params = (
+                int(time.time()),
                 'emergency',
                 event_description,
-                json.dumps(sensor_data) if sensor_data else None,
+                _dumps(sensor_data) if sensor_data else None,
                 action_taken
-            ))
+            )
+            
+            with self._lock:
+                self._insert(INSERT_EMERGENCY_SQL, params)
             
-            conn.commit()
-            conn.close()
             logger.critical(f"Emergency logged: {event_description}")
             
         except Exception as e:
@@ -131,22 +275,15 @@ class DataLogger:
     def log_performance_metric(self, metric_name, value, unit=None):
         """Log performance metric."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                INSERT INTO performance_metrics 
-                (timestamp, metric_name, metric_value, unit)
-                VALUES (?, ?, ?, ?)
-            ''', (
-                datetime.now().isoformat(),
+            params = (
+                int(time.time()),
                 metric_name,
                 float(value),
                 unit
-            ))
+            )
             
-            conn.commit()
-            conn.close()
+            with self._lock:
+                self._insert(INSERT_METRIC_SQL, params)
             
         except Exception as e:
             logger.error(f"Error logging performance metric: {e}")
@@ -154,18 +291,21 @@ class DataLogger:
     def get_recent_data(self, hours=24, table='system_state'):
         """Get recent data from specified table."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute(f'''
-                SELECT * FROM {table} 
-                WHERE datetime(timestamp) > datetime('now', '-{hours} hours')
-                ORDER BY timestamp DESC
-            ''')
-            
-            columns = [description[0] for description in cursor.description]
-            rows = cursor.fetchall()
-            conn.close()
+            if table not in TABLES:
+                raise ValueError(f"Unknown table: {table}")
+            
+            # Make queued rows visible to the query
+            self.flush()
+            
+            with self._lock:
+                cursor = self.conn.execute(f'''
+                    SELECT * FROM {table} 
+                    WHERE timestamp > ?
+                    ORDER BY timestamp DESC
+                ''', (_cutoff(hours=hours),))
+                
+                columns = [description[0] for description in cursor.description]
+                rows = cursor.fetchall()
             
             return [dict(zip(columns, row)) for row in rows]
             
@@ -176,29 +316,33 @@ class DataLogger:
     def get_system_statistics(self, hours=24):
         """Get system performance statistics."""
         try:
-            data = self.get_recent_data(hours)
-            
-            if not data:
+            # Make queued rows visible to the aggregates
+            self.flush()
+            
+            cutoff = _cutoff(hours=hours)
+            with self._lock:
+                # Source usage at hourly resolution, from the rollup rather than raw rows
+                source_counts = self.conn.execute('''
+                    SELECT source, SUM(cnt) FROM hourly_rollup 
+                    WHERE hour_ts >= ?
+                    GROUP BY source
+                ''', (cutoff - cutoff % ROLLUP_PERIOD,)).fetchall()
+                
+                emergency_count = self.conn.execute('''
+                    SELECT COUNT(*) FROM emergency_events 
+                    WHERE timestamp > ?
+                ''', (cutoff,)).fetchone()[0]
+            
+            total_entries = sum(count for _, count in source_counts)
+            if not total_entries:
                 return {}
             
-            # Count source usage
-            source_counts = {}
-            total_entries = len(data)
-            
-            for entry in data:
-                source = entry['current_source']
-                source_counts[source] = source_counts.get(source, 0) + 1
-            
             # Calculate percentages
             source_percentages = {
                 source: (count / total_entries) * 100 
-                for source, count in source_counts.items()
+                for source, count in source_counts
             }
             
-            # Get emergency count
-            emergency_data = self.get_recent_data(hours, 'emergency_events')
-            emergency_count = len(emergency_data)
-            
             return {
                 'total_entries': total_entries,
                 'source_usage': source_percentages,
@@ -214,37 +358,52 @@ class DataLogger:
     def cleanup_old_data(self, days=30):
         """Remove data older than specified days."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            cutoff = _cutoff(days=days)
             
-            tables = ['system_state', 'emergency_events', 'performance_metrics']
-            
-            for table in tables:
-                cursor.execute(f'''
-                    DELETE FROM {table} 
-                    WHERE datetime(timestamp) < datetime('now', '-{days} days')
-                ''')
+            with self._lock:
+                for table in TABLES:
+                    self.conn.execute(f'''
+                        DELETE FROM {table} 
+                        WHERE timestamp < ?
+                    ''', (cutoff,))
+                self.conn.execute('DELETE FROM hourly_rollup WHERE hour_ts < ?',
+                                  (cutoff - cutoff % ROLLUP_PERIOD,))
             
-            conn.commit()
-            conn.close()
             logger.info(f"Cleaned up data older than {days} days")
             
         except Exception as e:
             logger.error(f"Error cleaning up old data: {e}")
     
     def export_data(self, output_file, hours=24):
-        """Export recent data to JSON file."""
+        """Export recent data to JSON file, streaming rows from the database as they are read."""
         try:
-            data = {
-                'system_state': self.get_recent_data(hours, 'system_state'),
-                'emergency_events': self.get_recent_data(hours, 'emergency_events'),
-                'performance_metrics': self.get_recent_data(hours, 'performance_metrics'),
-                'statistics': self.get_system_statistics(hours),
-                'export_timestamp': datetime.now().isoformat()
-            }
-            
-            with open(output_file, 'w') as f:
-                json.dump(data, f, indent=2)
+            # Make queued rows visible to the export
+            self.flush()
+            cutoff = _cutoff(hours=hours)
+            
+            # Own read connection: under WAL it reads alongside the logger without taking its lock
+            reader = sqlite3.connect(self.db_path)
+            reader.row_factory = sqlite3.Row
+            try:
+                with open(output_file, 'w') as f:
+                    f.write('{\n')
+                    for table in TABLES:
+                        f.write(f'"{table}": [')
+                        separator = '\n'
+                        for row in reader.execute(f'''
+                            SELECT * FROM {table} 
+                            WHERE timestamp > ?
+                            ORDER BY timestamp DESC
+                        ''', (cutoff,)):
+                            f.write(separator)
+                            f.write(_dumps(dict(row)))
+                            separator = ',\n'
+                        f.write('\n],\n')
+                    
+                    f.write(f'"statistics": {_dumps(self.get_system_statistics(hours))},\n')
+                    f.write(f'"export_timestamp": {_dumps(datetime.now().isoformat())}\n}}\n')
+            finally:
+                reader.close()
             
             logger.info(f"Data exported to {output_file}")
             
@@ -252,7 +411,22 @@ class DataLogger:
             logger.error(f"Error exporting data: {e}")
     
     def close(self):
-        """Close data logger (cleanup if needed)."""
+        """Close data logger and its database connection; later calls do nothing."""
+        if self.conn is None:
+            return
+        
+        # Stop the flusher and write whatever it left queued
+        self._closing = True
+        self._flush_event.set()
+        self._flush_thread.join(timeout=5)
+        self.flush()
+        
         # Perform any necessary cleanup
         self.cleanup_old_data()
+        
+        with self._lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+                self._insert = None
         logger.info("Data logger closed")
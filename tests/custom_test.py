@@ -5,158 +5,344 @@ This script allows you to input your own sensor readings to test the AI model
 
 import sys
 import os
+import json
+import time
+import atexit
+import select
 from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
 
-# Add src to path
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+# Windows consoles cannot be polled with select(); msvcrt.kbhit() is used there instead
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
 
-from ai_models.energy_optimizer import EnergyOptimizer
+# POSIX terminal control for single-keystroke answers
+try:
+    import termios
+    import tty
+except ImportError:
+    termios = tty = None
+
+# Make the project root importable when run from a checkout (an editable install already covers it)
+_PROJECT_ROOT = str(Path(__file__).resolve().parent.parent)
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
+
+from src.ai_models import energy_optimizer
+from src.ai_models.energy_optimizer import EnergyOptimizer
+
+# Numeric sensor inputs: (key, prompt label, min, max, default)
+FIELDS = (
+    ('solar_irradiance', "Solar Irradiance (0-1000 W/m²)", 0, 1000, 500),
+    ('temperature', "Temperature (10-40°C)", 10, 40, 25),
+    ('humidity', "Humidity (30-90%)", 30, 90, 60),
+    ('battery_level', "Battery Level (0-100%)", 0, 100, 70),
+    ('power_demand', "Power Demand (50-300 W)", 50, 300, 120),
+    ('wind_speed', "Wind Speed (0-20 m/s)", 0, 20, 5),
+    ('time_of_day', "Time of Day (0-23 hours)", 0, 23, 14),
+)
+WEATHER_DEFAULT = "sunny"
+FIELD_KEYS = tuple(key for key, _, _, _, _ in FIELDS)
+DEFAULT_READINGS = {key: default for key, _, _, _, default in FIELDS}
+DEFAULT_READINGS['weather_condition'] = WEATHER_DEFAULT
+
+# Report separators
+SEP60 = "=" * 60
+SEP50 = "=" * 50
+RULE50 = "-" * 50
+
+# Seconds a prompt waits before using its default. At a terminal prompts wait for the person
+# typing unless CUSTOM_TEST_TIMEOUT sets a limit; redirected input that stalls for PIPE_TIMEOUT
+# is treated as finished, and the remaining prompts take their defaults without waiting
+INPUT_TIMEOUT = float(os.environ.get('CUSTOM_TEST_TIMEOUT') or 0) or None
+PIPE_TIMEOUT = 5.0
+
+# Bytes read from the stdin descriptor but not yet handed out. POSIX reads bypass sys.stdin's
+# own buffer so that select() never misses a line that has already been read
+_pending = bytearray()
+_stalled = False
+
+def _read_line(timeout):
+    """Next line from stdin, or None if none completes within `timeout` seconds (None waits); EOFError at end of input"""
+    if msvcrt is not None:
+        if timeout is not None and sys.stdin.isatty():
+            deadline = time.monotonic() + timeout
+            while not msvcrt.kbhit():
+                if time.monotonic() >= deadline:
+                    return None
+                time.sleep(0.05)
+        line = sys.stdin.readline()
+        if not line:
+            raise EOFError
+        return line.rstrip('\r\n')
+    
+    fd = sys.stdin.fileno()
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while b'\n' not in _pending:
+        if deadline is not None:
+            ready, _, _ = select.select([fd], [], [], max(0.0, deadline - time.monotonic()))
+            if not ready:
+                return None
+        chunk = os.read(fd, 4096)
+        if not chunk:
+            if not _pending:
+                raise EOFError
+            break
+        _pending.extend(chunk)
+    
+    line, _, rest = _pending.partition(b'\n')
+    _pending[:] = rest
+    return line.decode(sys.stdin.encoding or 'utf-8', 'replace').rstrip('\r')
+
+def _discard_typeahead():
+    """Drop anything typed after a prompt timed out, so it cannot answer the next prompt"""
+    _pending.clear()
+    if msvcrt is not None:
+        while msvcrt.kbhit():
+            msvcrt.getwch()
+    elif termios is not None:
+        termios.tcflush(sys.stdin.fileno(), termios.TCIFLUSH)
+
+def _read_answer(prompt):
+    """Prompt for a line of input, returning None if it times out"""
+    global _stalled
+    sys.stdout.write(prompt)
+    sys.stdout.flush()
+    if sys.stdin.isatty():
+        line = _read_line(INPUT_TIMEOUT)
+        if line is None:
+            _discard_typeahead()
+        return line
+    
+    if _stalled:
+        return None
+    line = _read_line(INPUT_TIMEOUT or PIPE_TIMEOUT)
+    _stalled = line is None
+    return line
+
+def _input_with_default(prompt, default):
+    """Prompt for a line of input, returning `default` if it times out or input has ended"""
+    try:
+        line = _read_answer(prompt)
+    except EOFError:
+        return str(default)
+    if line is None:
+        print("(timeout, using default)")
+        return str(default)
+    return line.strip()
+
+def _read_key(choices):
+    """Read single keypresses from the terminal until one of `choices` is pressed"""
+    if msvcrt is not None:
+        while True:
+            key = msvcrt.getwch().lower()
+            if key in choices:
+                return key
+    
+    fd = sys.stdin.fileno()
+    old_attrs = termios.tcgetattr(fd)
+    try:
+        tty.setcbreak(fd)
+        while True:
+            if not _pending:
+                chunk = os.read(fd, 64)
+                if not chunk:
+                    raise EOFError
+                _pending.extend(chunk)
+            key = chr(_pending.pop(0)).lower()
+            if key in choices:
+                return key
+    finally:
+        termios.tcsetattr(fd, termios.TCSADRAIN, old_attrs)
+
+def _key_yn(prompt):
+    """Ask a yes/no question; on a terminal a single y or n keypress answers it"""
+    if sys.stdin.isatty() and (msvcrt is not None or termios is not None):
+        sys.stdout.write(prompt)
+        sys.stdout.flush()
+        key = _read_key('yn')
+        print(key)
+        return key == 'y'
+    
+    # Redirected input: answers arrive as whole lines, and a stalled or finished producer means no
+    while True:
+        try:
+            answer = _read_answer(prompt)
+        except EOFError:
+            print()
+            return False
+        if answer is None:
+            print("(timeout)")
+            return False
+        answer = answer.strip().lower()
+        if answer in ('y', 'yes'):
+            return True
+        if answer in ('n', 'no'):
+            return False
+        print("Please enter 'y' for yes or 'n' for no.")
+
+# Decisions persisted between sessions, keyed on the optimizer's decision_key for the inputs
+CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".custom_test_cache.json")
+
+def _model_fingerprint():
+    """Identifies the optimizer build, so cached decisions are dropped once it changes"""
+    return str(os.stat(energy_optimizer.__file__).st_mtime_ns)
+
+def _load_decisions(fingerprint):
+    """Decisions cached by earlier sessions against the same optimizer build"""
+    try:
+        with open(CACHE_PATH) as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    
+    if cached.get('model') != fingerprint:
+        return {}
+    return cached.get('decisions', {})
+
+def _save_decisions(fingerprint, decisions):
+    """Write the session's decisions back to the cache file"""
+    try:
+        with open(CACHE_PATH, 'w') as f:
+            json.dump({'model': fingerprint, 'decisions': decisions}, f)
+    except OSError:
+        pass
+
+@lru_cache(maxsize=None)
+def _clip_bounds():
+    """Per-field (lows, highs) arrays in FIELDS order, built on first use"""
+    import numpy as np  # Loaded on first clamp to keep script start-up light
+    lows = np.array([lo for _, _, lo, _, _ in FIELDS], dtype=np.int64)
+    highs = np.array([hi for _, _, _, hi, _ in FIELDS], dtype=np.int64)
+    return lows, highs
+
+def get_user_inputs_batch(rows):
+    """Clamp an (N, 7) array of numeric readings, columns in FIELDS order, to their valid ranges"""
+    import numpy as np
+    lows, highs = _clip_bounds()
+    return np.clip(np.asarray(rows, dtype=np.int64), lows, highs)
 
 def get_user_input():
     """Get sensor readings from user input"""
-    print("\n" + "="*50)
+    print("\n" + SEP50)
     print("ENTER YOUR CUSTOM SENSOR READINGS")
-    print("="*50)
+    print(SEP50)
     print("Please enter the following sensor values:")
     print("(Press Enter for default values shown in brackets)")
+    print("(Or answer the first prompt with all 8 values: solar temp hum batt demand wind hour weather)")
     print()
     
     try:
-        # Solar Irradiance
-        solar_input = input("Solar Irradiance (0-1000 W/m²) [500]: ").strip()
-        solar_irradiance = int(solar_input) if solar_input else 500
-        
-        # Temperature
-        temp_input = input("Temperature (10-40°C) [25]: ").strip()
-        temperature = int(temp_input) if temp_input else 25
-        
-        # Humidity
-        humidity_input = input("Humidity (30-90%) [60]: ").strip()
-        humidity = int(humidity_input) if humidity_input else 60
-        
-        # Battery Level
-        battery_input = input("Battery Level (0-100%) [70]: ").strip()
-        battery_level = int(battery_input) if battery_input else 70
-        
-        # Power Demand
-        demand_input = input("Power Demand (50-300 W) [120]: ").strip()
-        power_demand = int(demand_input) if demand_input else 120
-        
-        # Wind Speed
-        wind_input = input("Wind Speed (0-20 m/s) [5]: ").strip()
-        wind_speed = int(wind_input) if wind_input else 5
-        
-        # Time of Day
-        time_input = input("Time of Day (0-23 hours) [14]: ").strip()
-        time_of_day = int(time_input) if time_input else 14
-        
-        # Weather condition (optional)
-        weather_input = input("Weather Condition [sunny]: ").strip()
-        weather_condition = weather_input if weather_input else "sunny"
+        # The first answer is the solar reading, unless it holds several values
+        _, label, _, _, default = FIELDS[0]
+        line = _input_with_default(f"{label} [{default}]: ", default)
+        parts = line.replace(',', ' ').split()
+        if len(parts) > 1:
+            # Fast path: all values on one line, whitespace or comma separated
+            if len(parts) != len(FIELDS) + 1:
+                raise ValueError(f"expected {len(FIELDS) + 1} values, got {len(parts)}")
+            
+            values = [int(part) for part in parts[:-1]]
+            weather_condition = parts[-1]
+        else:
+            # Guided path: one prompt per remaining field
+            values = [int(line) if line else default]
+            for _, label, _, _, default in FIELDS[1:]:
+                value = _input_with_default(f"{label} [{default}]: ", default)
+                values.append(int(value) if value else default)
+            
+            # Weather condition (optional)
+            weather_input = _input_with_default(f"Weather Condition [{WEATHER_DEFAULT}]: ", WEATHER_DEFAULT)
+            weather_condition = weather_input if weather_input else WEATHER_DEFAULT
         
         # Validate ranges
-        solar_irradiance = max(0, min(1000, solar_irradiance))
-        temperature = max(10, min(40, temperature))
-        humidity = max(30, min(90, humidity))
-        battery_level = max(0, min(100, battery_level))
-        power_demand = max(50, min(300, power_demand))
-        wind_speed = max(0, min(20, wind_speed))
-        time_of_day = max(0, min(23, time_of_day))
-        
-        return {
-            'solar_irradiance': solar_irradiance,
-            'temperature': temperature,
-            'humidity': humidity,
-            'battery_level': battery_level,
-            'power_demand': power_demand,
-            'wind_speed': wind_speed,
-            'time_of_day': time_of_day,
-            'weather_condition': weather_condition
-        }
+        clamped = get_user_inputs_batch([values])[0].tolist()
+        readings = dict(zip(FIELD_KEYS, clamped))
+        readings['weather_condition'] = weather_condition
+        return readings
         
-    except ValueError:
+    except (ValueError, OverflowError):
         print("Invalid input! Using default values.")
-        return {
-            'solar_irradiance': 500,
-            'temperature': 25,
-            'humidity': 60,
-            'battery_level': 70,
-            'power_demand': 120,
-            'wind_speed': 5,
-            'time_of_day': 14,
-            'weather_condition': 'sunny'
-        }
+        return dict(DEFAULT_READINGS)
 
 def test_custom_scenario():
     """Test the AI model with custom user input"""
     
-    print("="*60)
+    print(SEP60)
     print("DUAL ENERGY SOURCE AI MODEL - CUSTOM INPUT TEST")
-    print("="*60)
+    print(SEP60)
     print(f"Test started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print()
     
     # Initialize the AI model
     optimizer = EnergyOptimizer()
     
+    # Decisions computed this session or an earlier one, saved again on exit
+    fingerprint = _model_fingerprint()
+    decisions = _load_decisions(fingerprint)
+    atexit.register(_save_decisions, fingerprint, decisions)
+    
     energy_sources = ['Solar Power', 'Thermal Energy', 'Battery Power']
     
     while True:
         # Get custom sensor data from user
         sensor_data = get_user_input()
         
-        print("\n" + "-"*50)
-        print("YOUR INPUT SUMMARY:")
-        print("-"*50)
-        print(f"Solar Irradiance: {sensor_data['solar_irradiance']} W/m²")
-        print(f"Temperature: {sensor_data['temperature']}°C")
-        print(f"Humidity: {sensor_data['humidity']}%")
-        print(f"Battery Level: {sensor_data['battery_level']}%")
-        print(f"Power Demand: {sensor_data['power_demand']} W")
-        print(f"Wind Speed: {sensor_data['wind_speed']} m/s")
-        print(f"Time of Day: {sensor_data['time_of_day']}:00")
-        print(f"Weather: {sensor_data['weather_condition']}")
+        # Get AI prediction (one scoring pass yields both the source and its explanation)
+        key = str(energy_optimizer.decision_key(optimizer.standardize_sensor_data(sensor_data)))
+        explanation = decisions.get(key)
+        if explanation is None:
+            explanation = decisions[key] = optimizer.analyze(sensor_data)['explanation']
+        scores = explanation['scores']
+        analysis = explanation['sensor_analysis']
         
-        # Get AI prediction
-        optimal_source = optimizer.predict_optimal_source(sensor_data)
-        explanation = optimizer.explain_decision(sensor_data)
+        # Assemble the whole report and write it in one call
+        out = []
+        append = out.append
+        append("\n" + RULE50)
+        append("YOUR INPUT SUMMARY:")
+        append(RULE50)
+        append(f"Solar Irradiance: {sensor_data['solar_irradiance']} W/m²")
+        append(f"Temperature: {sensor_data['temperature']}°C")
+        append(f"Humidity: {sensor_data['humidity']}%")
+        append(f"Battery Level: {sensor_data['battery_level']}%")
+        append(f"Power Demand: {sensor_data['power_demand']} W")
+        append(f"Wind Speed: {sensor_data['wind_speed']} m/s")
+        append(f"Time of Day: {sensor_data['time_of_day']}:00")
+        append(f"Weather: {sensor_data['weather_condition']}")
         
-        print("\n" + "="*50)
-        print("AI MODEL ANALYSIS RESULTS:")
-        print("="*50)
-        print(f"RECOMMENDED ENERGY SOURCE: {explanation['chosen_source']}")
-        print(f"Confidence Level: {explanation['confidence']:.2%}")
-        print()
-        print("Detailed Scoring:")
-        scores = explanation['scores']
-        print(f"  Solar Power Score:  {scores['solar_score']:+2d}")
-        print(f"  Thermal Energy Score: {scores['thermal_score']:+2d}")
-        print(f"  Battery Power Score:  {scores['battery_score']:+2d}")
-        print()
+        append("\n" + SEP50)
+        append("AI MODEL ANALYSIS RESULTS:")
+        append(SEP50)
+        append(f"RECOMMENDED ENERGY SOURCE: {explanation['chosen_source']}")
+        append(f"Confidence Level: {explanation['confidence']:.2%}")
+        append("")
+        append("Detailed Scoring:")
+        append(f"  Solar Power Score:  {scores['solar_score']:+2d}")
+        append(f"  Thermal Energy Score: {scores['thermal_score']:+2d}")
+        append(f"  Battery Power Score:  {scores['battery_score']:+2d}")
+        append("")
         
-        print(f"AI Reasoning:")
-        for reason in explanation['reasoning']:
-            print(f"  • {reason}")
+        append("AI Reasoning:")
+        out.extend(f"  • {reason}" for reason in explanation['reasoning'])
         
-        print(f"\nSensor Analysis:")
-        analysis = explanation['sensor_analysis']
-        print(f"  • Solar Conditions: {analysis['solar']}")
-        print(f"  • Thermal Conditions: {analysis['thermal']}")
-        print(f"  • Battery Status: {analysis['battery']}")
+        append("\nSensor Analysis:")
+        append(f"  • Solar Conditions: {analysis['solar']}")
+        append(f"  • Thermal Conditions: {analysis['thermal']}")
+        append(f"  • Battery Status: {analysis['battery']}")
         
-        print("\n" + "="*60)
+        append("\n" + SEP60)
+        sys.stdout.write("\n".join(out) + "\n")
+        sys.stdout.flush()
         
         # Ask if user wants to test another scenario
-        while True:
-            continue_test = input("\nWould you like to test another scenario? (y/n): ").strip().lower()
-            if continue_test in ['y', 'yes']:
-                break
-            elif continue_test in ['n', 'no']:
-                print("\nThank you for testing the Dual Energy Source AI Model!")
-                print("The system is ready for real hardware integration!")
-                return
-            else:
-                print("Please enter 'y' for yes or 'n' for no.")
+        if not _key_yn("\nWould you like to test another scenario? (y/n): "):
+            print("\nThank you for testing the Dual Energy Source AI Model!")
+            print("The system is ready for real hardware integration!")
+            return
 
 if __name__ == "__main__":
     try: